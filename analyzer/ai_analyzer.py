@@ -2,27 +2,16 @@ import logging
 import os
 import json
 import re
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional
 from datetime import datetime, timezone, timedelta
 
+from utils.metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
-class AIAnalyzer:
-    def __init__(self):
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        from anthropic import Anthropic
-        self.client = Anthropic(api_key=api_key)
-        # 🚀 修正：確定した最新モデル ID を使用
-        self.model = "claude-haiku-4-5-20251001" 
-        logger.info(f"AI解析ユニット(Claude 4.5 Haiku)起動完了")
-    
-    def get_prompt(self, title: str, content: str, url: str) -> str:
-        jst = timezone(timedelta(hours=9))
-        today = datetime.now(jst)
-        today_str = today.strftime('%Y-%m-%d')
-        r_year = today.year - 2018
-        
-        return f"""あなたは自治体入札案件のプロ査定士です。今日: {today_str} (令和{r_year}年)
+# 📌 全ページ共通の判定ルール（日付やURLなど毎回変わる情報はここに入れないこと）
+SYSTEM_PROMPT = """あなたは自治体入札案件のプロ査定士です。今日の日付はユーザーメッセージ冒頭の「今日」を基準にしてください。
 
 # 🎯 判定ミッション
 Webページから「映像制作・動画制作・ライブ配信」の業務委託を探してください。
@@ -40,39 +29,142 @@ Webページから「映像制作・動画制作・ライブ配信」の業務
 # ⚠️ 令和8年(2026) 厳守
 - 本文に「令和8年」または「2026年」という具体的な未来の予定・期限があること。
 - 令和6年や令和7年が主役の案件は全て Label C としてください。
-- 「募集期間」「提案書受出期間」「申込期限」が今日({today_str})を過ぎているものは、たとえ令和8年の仕事であっても Label C としてください。
+- 「募集期間」「提案書受出期間」「申込期限」が今日を過ぎているものは、たとえ令和8年の仕事であっても Label C としてください。
 - **注意**: 「履行期間（仕事の納期）」が未来であっても、募集自体が終わっていれば対象外です。
 
 # 出力形式 (JSON)
-{{
+{
   "label": "A, B, または C",
   "title": "正式な案件名",
-  "source_url": "{url}", 
+  "source_url": "ユーザーメッセージの URL をそのまま記載",
   "deadline_apply": "YYYY-MM-DD (不明時は 不明)",
   "deadline_prop": "YYYY-MM-DD (不明時は 不明)",
   "prefecture": "自治体名",
   "evidence": "映像制作の必要性と現在募集中である根拠",
-  "memo": "令和{r_year}年度(2026)案件であることを確認済み"
-}}
+  "memo": "令和(今日の令和年)年度(2026)案件であることを確認済み"
+}
+"""
+
+# 📌 プロンプトキャッシュが効く前置きの最小長（claude-haiku-4-5 は 4096 トークン）
+# これより短い前置きに cache_control を付けても保存されず、キャッシュ読込は常に 0 になる。
+PROMPT_CACHE_MIN_TOKENS = 4096
+
+
+def estimate_tokens(text: str) -> int:
+    """おおよそのトークン数（日本語は1文字≒1トークン、英数字は4文字≒1トークンとしたざっくりした値）"""
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return (len(text) - ascii_chars) + ascii_chars // 4
+
+
+class AIAnalyzer:
+    # プロンプト文面を変えたら上げる（解析キャッシュのキーに含まれる）
+    PROMPT_VERSION = "2"
+
+    def __init__(self, cache=None, client=None):
+        if client is None:
+            api_key = os.getenv('ANTHROPIC_API_KEY')
+            from anthropic import Anthropic
+            client = Anthropic(api_key=api_key)
+        # client: 記録・再生版（analyzer.replay_client）に差し替えるとオフラインで動かせる
+        self.client = client
+        # 🚀 修正：確定した最新モデル ID を使用
+        self.model = "claude-haiku-4-5-20251001" 
+        self.cache = cache
+        self.usage = {'input_tokens': 0, 'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0, 'output_tokens': 0}
+        self._usage_lock = threading.Lock()
+        # 共通ルールがキャッシュの最小長に届くときだけ cache_control を付ける（今の文面は届かない）
+        self.prompt_cache_enabled = estimate_tokens(SYSTEM_PROMPT) >= PROMPT_CACHE_MIN_TOKENS
+        logger.info(f"AI解析ユニット(Claude 4.5 Haiku)起動完了")
+        if not self.prompt_cache_enabled:
+            logger.info(f"ℹ️ 共通ルールは約{estimate_tokens(SYSTEM_PROMPT)}トークンで、プロンプトキャッシュの最小長"
+                        f"（{PROMPT_CACHE_MIN_TOKENS}トークン）に届かないためキャッシュは使いません")
+    
+    def get_system_blocks(self) -> List[Dict]:
+        """全ページ共通の判定ルール（キャッシュの最小長に届く場合だけプロンプトキャッシュの対象にする）"""
+        block = {"type": "text", "text": SYSTEM_PROMPT}
+        if self.prompt_cache_enabled:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def get_prompt(self, title: str, content: str, url: str) -> str:
+        """ページごとに変わる部分（日付・URL・本文）だけを組み立てる"""
+        jst = timezone(timedelta(hours=9))
+        today = datetime.now(jst)
+        today_str = today.strftime('%Y-%m-%d')
+        r_year = today.year - 2018
+        
+        return f"""今日: {today_str} (令和{r_year}年)
+URL: {url}
 
 ---
 件名: {title}
 内容: {content[:13000]}
 """
 
+    def build_request(self, title: str, content: str, url: str) -> Dict:
+        """messages.create / バッチ投入で共通のリクエスト本体"""
+        return {
+            'model': self.model,
+            'max_tokens': 1000,
+            'temperature': 0,
+            'system': self.get_system_blocks(),
+            'messages': [{"role": "user", "content": self.get_prompt(title, content, url)}],
+        }
+
+    def record_usage(self, message):
+        """キャッシュ読込／書込／非キャッシュの入力トークンを集計"""
+        usage = getattr(message, 'usage', None)
+        if usage is None:
+            return
+        with self._usage_lock:
+            for key in self.usage:
+                self.usage[key] += getattr(usage, key, None) or 0
+
+    @staticmethod
+    def observe_usage(message):
+        """1回の呼び出しあたりの入出力トークン数（キャッシュ分も入力に含める）"""
+        usage = getattr(message, 'usage', None)
+        if usage is None:
+            return
+        input_tokens = sum(getattr(usage, key, None) or 0
+                           for key in ('input_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'))
+        METRICS.observe('input_tokens_per_call', input_tokens)
+        METRICS.observe('output_tokens_per_call', getattr(usage, 'output_tokens', None) or 0)
+
+    def usage_stats(self) -> Dict[str, int]:
+        with self._usage_lock:
+            return dict(self.usage)
+
+    @staticmethod
+    def parse_response(message) -> Optional[Dict]:
+        """AIの返答からJSON部分だけを取り出す"""
+        res_text = message.content[0].text
+        match = re.search(r'\{.*\}', res_text, re.DOTALL)
+        if match:
+            return json.loads(match.group(0))
+        return None
+
+    def cache_key(self, title: str, content: str) -> Optional[str]:
+        if not self.cache:
+            return None
+        # プロンプトに入るのは先頭13000文字だけなので、キーもそれに合わせる
+        return self.cache.make_key(self.model, self.PROMPT_VERSION, title, content[:13000])
+
     def analyze_single(self, title: str, content: str, url: str) -> Optional[Dict]:
+        cache_key = self.cache_key(title, content)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, 'source_url': url}
         try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                temperature=0,
-                messages=[{"role": "user", "content": self.get_prompt(title, content, url)}]
-            )
-            res_text = message.content[0].text
-            match = re.search(r'\{.*\}', res_text, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            return None
+            with METRICS.timer('analyze'):
+                message = self.client.messages.create(**self.build_request(title, content, url))
+            self.record_usage(message)
+            self.observe_usage(message)
+            result = self.parse_response(message)
+            if result is not None and cache_key:
+                self.cache.put(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"解析エラー: {e}")
             return None
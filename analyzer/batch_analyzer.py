@@ -0,0 +1,87 @@
+"""Message Batches API を使った一括解析バックエンド"""
+
+import logging
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from analyzer.ai_analyzer import AIAnalyzer
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalyzer(AIAnalyzer):
+    """全プロンプトを1つのバッチジョブとして投入し、完了後に結果を順次返す"""
+
+    # 1バッチあたりの投入上限（API側の上限より十分小さく）
+    MAX_REQUESTS_PER_BATCH = 10000
+
+    def __init__(self, cache=None, poll_interval: Optional[float] = None):
+        super().__init__(cache=cache)
+        self.poll_interval = poll_interval or settings.BATCH_POLL_INTERVAL
+        # SDKのバージョンによってはベータ扱い
+        self.batches = getattr(self.client.messages, 'batches', None) or self.client.beta.messages.batches
+
+    def submit(self, items: List[Dict]) -> str:
+        """items: [{'custom_id', 'title', 'content', 'url'}, ...] をバッチ投入してIDを返す"""
+        batch = self.batches.create(requests=[
+            {'custom_id': item['custom_id'], 'params': self.build_request(item['title'], item['content'], item['url'])}
+            for item in items
+        ])
+        logger.info(f"📦 バッチ投入完了: {batch.id} ({len(items)}件)")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """processing_status が ended になるまでポーリング"""
+        while True:
+            batch = self.batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                return batch
+            counts = batch.request_counts
+            logger.info(f"⏳ バッチ処理中: {batch_id} (処理中 {counts.processing} / 成功 {counts.succeeded} / 失敗 {counts.errored})")
+            time.sleep(self.poll_interval)
+
+    def iter_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """完了したバッチの結果を1件ずつ (custom_id, 解析結果) で返す"""
+        for entry in self.batches.results(batch_id):
+            if entry.result.type != 'succeeded':
+                logger.error(f"解析エラー: {entry.custom_id} - {entry.result.type}")
+                yield entry.custom_id, None
+                continue
+            try:
+                self.record_usage(entry.result.message)
+                yield entry.custom_id, self.parse_response(entry.result.message)
+            except Exception as e:
+                logger.error(f"解析エラー: {entry.custom_id} - {e}")
+                yield entry.custom_id, None
+
+    def analyze_many(self, items: List[Dict]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """キャッシュにあるものは即座に返し、残りをバッチで解析して返す"""
+        misses = []
+        keys = {}
+        for item in items:
+            key = self.cache_key(item['title'], item['content'])
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                yield item['custom_id'], {**cached, 'source_url': item['url']}
+            else:
+                keys[item['custom_id']] = key
+                misses.append(item)
+
+        # 先に全チャンクを投入してから順に待つ（API側で並行して処理される）
+        batch_ids = []
+        for i in range(0, len(misses), self.MAX_REQUESTS_PER_BATCH):
+            try:
+                batch_ids.append(self.submit(misses[i:i + self.MAX_REQUESTS_PER_BATCH]))
+            except Exception as e:
+                logger.error(f"バッチ投入エラー: {e}")
+
+        for batch_id in batch_ids:
+            try:
+                self.wait(batch_id)
+                for custom_id, result in self.iter_results(batch_id):
+                    if result is not None and keys.get(custom_id):
+                        self.cache.put(keys[custom_id], result)
+                    yield custom_id, result
+            except Exception as e:
+                logger.error(f"バッチ結果取得エラー: {batch_id} - {e}")
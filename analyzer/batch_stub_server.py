@@ -0,0 +1,141 @@
+"""Message Batches API のローカル模擬サーバー（オフライン動作確認用）
+
+使い方:
+    python -m analyzer.batch_stub_server --port 8765 [--fixtures answers.json] [--delay 2]
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=dummy python main.py --batch
+
+--fixtures には custom_id または件名をキーに、返したい解析結果(JSON)を書いておく。
+該当が無い場合は件名に「動画」「映像」があれば Label A、なければ Label C を返す。
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class BatchStore:
+    def __init__(self, fixtures=None, delay=0.0):
+        self.fixtures = fixtures or {}
+        self.delay = delay
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _prompt_text(params):
+        content = params['messages'][-1]['content']
+        if isinstance(content, list):
+            return '\n'.join(block.get('text', '') for block in content)
+        return content
+
+    def answer(self, custom_id, params):
+        prompt = self._prompt_text(params)
+        m = re.search(r'件名: (.*)', prompt)
+        title = m.group(1).strip() if m else ''
+        url = re.search(r'"source_url": "([^"]*)"|URL: (\S+)', prompt)
+        analysis = self.fixtures.get(custom_id) or self.fixtures.get(title)
+        if analysis is None:
+            label = 'A' if re.search(r'動画|映像', title) else 'C'
+            analysis = {
+                'label': label, 'title': title,
+                'source_url': (url.group(1) or url.group(2)) if url else '',
+                'deadline_apply': '不明', 'deadline_prop': '不明',
+                'prefecture': '不明', 'evidence': 'stub', 'memo': 'stub',
+            }
+        return {
+            'id': f"msg_{uuid.uuid4().hex[:24]}", 'type': 'message', 'role': 'assistant',
+            'model': params.get('model'), 'stop_reason': 'end_turn', 'stop_sequence': None,
+            'content': [{'type': 'text', 'text': json.dumps(analysis, ensure_ascii=False)}],
+            'usage': {'input_tokens': len(prompt), 'output_tokens': 100},
+        }
+
+    def create(self, requests, base_url):
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.batches[batch_id] = {
+                'created': time.time(),
+                'base_url': base_url,
+                'results': [
+                    {'custom_id': r['custom_id'],
+                     'result': {'type': 'succeeded', 'message': self.answer(r['custom_id'], r['params'])}}
+                    for r in requests
+                ],
+            }
+        return self.describe(batch_id)
+
+    def describe(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = time.time() - batch['created'] >= self.delay
+        n = len(batch['results'])
+        created_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(batch['created']))
+        return {
+            'id': batch_id, 'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {'processing': 0 if ended else n, 'succeeded': n if ended else 0,
+                               'errored': 0, 'canceled': 0, 'expired': 0},
+            'created_at': created_at, 'expires_at': created_at,
+            'ended_at': created_at if ended else None,
+            'archived_at': None, 'cancel_initiated_at': None,
+            'results_url': f"{batch['base_url']}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='application/json'):
+            data = body.encode('utf-8') if isinstance(body, str) else json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _path_parts(self):
+            return [p for p in urlsplit(self.path).path.split('/') if p]
+
+        def do_POST(self):
+            parts = self._path_parts()
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if parts == ['v1', 'messages', 'batches']:
+                base_url = f"http://{self.headers.get('Host')}"
+                return self._send(200, store.create(payload.get('requests', []), base_url))
+            if len(parts) == 5 and parts[4] == 'cancel' and parts[3] in store.batches:
+                return self._send(200, store.describe(parts[3]))
+            self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+        def do_GET(self):
+            parts = self._path_parts()
+            if len(parts) >= 4 and parts[:3] == ['v1', 'messages', 'batches'] and parts[3] in store.batches:
+                if len(parts) == 4:
+                    return self._send(200, store.describe(parts[3]))
+                if parts[4:] == ['results']:
+                    lines = '\n'.join(json.dumps(r, ensure_ascii=False) for r in store.batches[parts[3]]['results'])
+                    return self._send(200, lines + '\n', 'application/binary')
+            self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, fixtures=None, delay=0.0):
+    """別スレッドで起動したいときは返り値の serve_forever をスレッドに渡す"""
+    return ThreadingHTTPServer(('127.0.0.1', port), make_handler(BatchStore(fixtures, delay)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message Batches API 模擬サーバー")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', help="custom_id/件名 → 解析結果 のJSONファイル")
+    parser.add_argument('--delay', type=float, default=0.0, help="バッチが ended になるまでの秒数")
+    args = parser.parse_args()
+    fixtures = json.load(open(args.fixtures, encoding='utf-8')) if args.fixtures else None
+    server = serve(args.port, fixtures, args.delay)
+    print(f"stub batch server: http://127.0.0.1:{args.port}")
+    server.serve_forever()
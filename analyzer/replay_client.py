@@ -0,0 +1,61 @@
+"""Anthropic クライアントの記録・再生版（AIAnalyzer(client=...) に渡して使う）
+
+記録版は本物の返答をアーカイブに残し、再生版はその返答をAPIに接続せずに返す。
+記録に無いリクエストには模擬サーバーと同じ規則（件名に「動画」「映像」があれば Label A）で答える。
+"""
+
+import hashlib
+import json
+from types import SimpleNamespace
+from typing import Dict
+
+from analyzer.batch_stub_server import BatchStore
+from utils.replay import FixtureArchive
+
+
+def request_key(params: Dict) -> str:
+    """日付行を除いたプロンプトで照合する（記録した日と再生する日が違っても当たるように）"""
+    content = params['messages'][-1]['content']
+    prompt = '\n'.join(line for line in content.splitlines() if not line.startswith('今日:'))
+    payload = json.dumps({'model': params.get('model'), 'prompt': prompt}, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _to_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+class _RecordingMessages:
+    def __init__(self, messages, archive: FixtureArchive):
+        self._messages = messages
+        self._archive = archive
+
+    def create(self, **params):
+        message = self._messages.create(**params)
+        self._archive.put_analysis(request_key(params), message.model_dump(mode='json'))
+        return message
+
+
+class RecordingAnthropicClient:
+    def __init__(self, client, archive: FixtureArchive):
+        self.messages = _RecordingMessages(client.messages, archive)
+
+
+class _ReplayMessages:
+    def __init__(self, archive: FixtureArchive):
+        self._archive = archive
+        self._fallback = BatchStore()
+
+    def create(self, **params):
+        key = request_key(params)
+        message = self._archive.get_analysis(key) or self._fallback.answer(key, params)
+        return _to_namespace(message)
+
+
+class ReplayAnthropicClient:
+    def __init__(self, archive: FixtureArchive):
+        self.messages = _ReplayMessages(archive)
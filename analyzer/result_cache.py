@@ -0,0 +1,69 @@
+"""AI解析結果のコンテンツアドレス型キャッシュ（TTL ＋ LRU、SQLite永続化）"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AnalysisCache:
+    """(モデル, プロンプト版, 件名, 正規化本文) のハッシュをキーに解析結果を保存する"""
+
+    def __init__(self, path: str, ttl_days: float = 7, max_entries: int = 20000):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                result TEXT,
+                created_at REAL,
+                last_access REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_access ON analyses(last_access)")
+        # 期限切れは起動時にまとめて掃除
+        self.conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, title: str, content: str) -> str:
+        normalized = re.sub(r'\s+', ' ', content).strip()
+        payload = '\x1f'.join([model, prompt_version, title.strip(), normalized])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT result, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+            if not row or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE analyses SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), now, now),
+            )
+            # 上限超過分は最終アクセスの古い順に追い出す
+            self.conn.execute("""
+                DELETE FROM analyses WHERE key IN (
+                    SELECT key FROM analyses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
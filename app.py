@@ -3,11 +3,11 @@
 対応項目: 取得日(JST), 都道府県, 案件名, 要約, 期限, 元URL, 申込URL
 """
 import streamlit as st
-import pandas as pd
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timezone, timedelta
 import plotly.express as px
+from database.dashboard_data import DashboardData, SheetSource, aggregate, filter_projects
 
 # ページ設定
 st.set_page_config(page_title="映像案件ダッシュボード", page_icon="🎬", layout="wide")
@@ -25,43 +25,85 @@ def get_sheets_client():
         st.error(f"認証情報の読み込みに失敗しました: {e}")
         return None
 
-@st.cache_data(ttl=300)
-def load_data():
+@st.cache_resource
+def get_dashboard_data():
+    """読み込み済みの行を持ち回すデータ層（再実行のたびに全件を読み直さない）"""
     client = get_sheets_client()
-    if not client: return pd.DataFrame()
-
-    # 先にシート名を決めておく（エラー防止）
-    now = datetime.now(JST)
-    sheet_name = now.strftime("映像案件_%Y年%m月")
-
+    if not client: return None
     try:
-        spreadsheet_id = st.secrets["spreadsheet_id"]
-        sheet = client.open_by_key(spreadsheet_id)
-        worksheet = sheet.worksheet(sheet_name)
-        
-        rows = worksheet.get_all_values()
-        if len(rows) <= 1: return pd.DataFrame()
-        
-        df = pd.DataFrame(rows[1:], columns=rows[0])
-        if '取得日' in df.columns:
-            df['取得日'] = pd.to_datetime(df['取得日'], errors='coerce')
-        return df
+        spreadsheet = client.open_by_key(st.secrets["spreadsheet_id"])
     except Exception as e:
-        # スプレッドシートが見つからない場合の警告
-        st.sidebar.warning(f"シート '{sheet_name}' を開けません。スプレッドシートが共有されているか確認してください。")
-        return pd.DataFrame()
+        st.sidebar.warning(f"スプレッドシートを開けません。共有設定を確認してください: {e}")
+        return None
+    return DashboardData(SheetSource(spreadsheet))
+
+@st.cache_data(ttl=3600)
+def list_months():
+    data = get_dashboard_data()
+    return data.months() if data else []
+
+@st.cache_data(ttl=300)
+def refresh(months):
+    """選ばれた月の追記分だけを取りに行き、データの版番号を返す（5分に1回まで）"""
+    return get_dashboard_data().refresh(list(months))
+
+@st.cache_data(max_entries=8)
+def load_data(months, version):
+    """型付きの DataFrame（版番号が変わったときだけ作り直す）"""
+    return get_dashboard_data().frame(list(months))
+
+@st.cache_data(max_entries=32)
+def filtered_view(months, version, prefectures, labels, deadline_window, open_only, today):
+    """絞り込んだ行と集計表（データの版番号と条件ごとに1回だけ計算する）"""
+    df = load_data(months, version)
+    deadline_from, deadline_to = (deadline_window + (None, None))[:2]
+    sliced = filter_projects(df, prefectures, labels, deadline_from, deadline_to, open_only, today)
+    return sliced, aggregate(sliced)
 
 def main():
     st.title("🎬 映像案件 自動収集システム")
-    df = load_data()
+    months = list_months()
+    if not months:
+        st.info("データがありません。スプレッドシートの共有設定やシート名（映像案件_2026年01月_v16）を確認してください。")
+        return
+
+    # 過去の月は選ばれたときに初めて読み込む
+    selected = tuple(st.sidebar.multiselect("対象月", months, default=months[:1]))
+    try:
+        version = refresh(selected)
+    except Exception as e:
+        st.sidebar.warning(f"シートを読み込めません: {e}")
+        return
+    df = load_data(selected, version)
 
     if df.empty:
-        st.info("データがありません。スプレッドシートの共有設定やシート名（映像案件_2026年01月）を確認してください。")
+        st.info("選んだ月の案件はまだありません。")
+        return
+
+    # --- 絞り込み（サーバー側で済ませ、画面には絞り込んだ行と集計表だけを送る） ---
+    prefectures = tuple(st.sidebar.multiselect("都道府県/市区町村", list(df['都道府県/市区町村'].cat.categories)))
+    labels = tuple(st.sidebar.multiselect("ラベル", list(df['ラベル'].cat.categories)))
+    deadline_window = tuple(st.sidebar.date_input("締切の範囲", value=()))
+    open_only = st.sidebar.checkbox("募集中のみ（締切前・締切不明）", value=True)
+    today = datetime.now(JST).date()
+    sliced, aggregates = filtered_view(selected, version, prefectures, labels, deadline_window, open_only, today)
+
+    col1, col2 = st.columns(2)
+    col1.metric("総案件数", f"{len(df)} 件")
+    col2.metric("条件に合う案件", f"{len(sliced)} 件")
+    if sliced.empty:
+        st.info("条件に合う案件はありません。")
         return
 
-    # --- 以下、グラフ表示などの処理（以前と同じ） ---
-    st.metric("総案件数", f"{len(df)} 件")
-    st.dataframe(df, use_container_width=True)
+    col1, col2 = st.columns(2)
+    col1.plotly_chart(px.bar(aggregates['prefecture'].head(30), x='都道府県/市区町村', y='件数',
+                             title="都道府県/市区町村別（上位30）"), use_container_width=True)
+    col2.plotly_chart(px.pie(aggregates['label'], names='ラベル', values='件数', title="ラベル別"),
+                      use_container_width=True)
+    if not aggregates['deadline_week'].empty:
+        st.plotly_chart(px.bar(aggregates['deadline_week'], x='締切週', y='件数', color='ラベル',
+                               title="締切週別"), use_container_width=True)
+    st.dataframe(sliced, use_container_width=True, hide_index=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,208 @@
+"""巡回〜本文抽出〜AI解析の通し計測（記録済み応答を再生してオフラインで動かす）
+
+使い方:
+    python main.py --record fixtures/run.sqlite3            # 本番の1回分を記録（要ネット接続・APIキー）
+    python -m benchmarks.bench_e2e --fixtures fixtures/run.sqlite3 [--latency 50] [--json out.json]
+    python -m benchmarks.bench_e2e                          # 記録が無ければ全自治体分の応答を合成して計測
+
+本番と同じ run_streaming_mode（巡回・タイトル門番・本文取得・AI解析を有界キューでつないだ流れ作業、
+ほぼ同じ公告の索引つき）を、共有セッションの再生アダプターと再生版 Anthropic クライアントで動かし、
+毎秒ページ数・毎秒タスク数・段ごとの p50/p95 レイテンシ・ピークメモリを表示する。
+巡回と選別は同時に進むので、毎秒の値はどちらも通しの所要時間で割ったもの。
+各種キャッシュは毎回の計測が同じ仕事量になるよう無効化し、ホスト単位の礼儀（レート制限）も外す。
+--incremental を付けると、空の既読ストアを使って本番の差分実行と同じ経路を通す。
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+
+class StageTimer:
+    """関数を包んで1回ごとの所要時間を貯める"""
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.samples.setdefault(stage, []).append(elapsed)
+        return timed
+
+    def summary(self):
+        with self.lock:
+            return {stage: {'count': len(v), 'p50_ms': percentile(v, 50) * 1000, 'p95_ms': percentile(v, 95) * 1000}
+                    for stage, v in self.samples.items()}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def synth_archive(archive, prefecture_pages):
+    """全自治体の開始URLに、映像案件リンク・ページ送り・詳細ページ・PDFを持つ応答を合成する"""
+    import fitz
+    doc = fitz.open()
+    for p in range(8):
+        page = doc.new_page()
+        page.insert_text((50, 50), "\n".join([f"Specification page {p}"] + ["Schedule 2026-03-31"] * 30), fontsize=9)
+    pdf = doc.tobytes()
+    doc.close()
+
+    html_headers = {'Content-Type': 'text/html; charset=utf-8'}
+    serial = 0
+    for pref, urls in prefecture_pages.items():
+        for i, url in enumerate(urls):
+            base = url.split('?')[0].rstrip('/')
+            rows = [
+                f'<li><a href="{base}/detail_{i}_a.html">令和8年度{pref}PR動画制作業務委託の公募について</a></li>',
+                f'<li><a href="{base}/detail_{i}_b.html">観光プロモーション映像撮影業務 企画提案募集</a></li>',
+                f'<li><a href="{base}/result_{i}.html">令和7年度 動画制作業務 落札結果</a></li>',
+                f'<li><a href="{base}/other_{i}.html">庁舎清掃業務の入札について</a></li>',
+            ]
+            listing = (f'<html><body><h1>{pref} 入札・公募情報</h1><ul>{"".join(rows)}</ul>'
+                       f'<a href="{base}/page2_{i}.html">次へ</a></body></html>')
+            page2 = (f'<html><body><ul><li><a href="{base}/detail_{i}_c.html">配信業務委託（PDF）</a></li>'
+                     f'</ul></body></html>')
+            archive.put_response('GET', url, 200, html_headers, listing.encode('utf-8'))
+            archive.put_response('GET', f"{base}/page2_{i}.html", 200, html_headers, page2.encode('utf-8'))
+            for suffix in ('a', 'b', 'c'):
+                # 案件ごとに番号・予算を変える（同じ定型文でも別案件として扱われるように）
+                serial += 1
+                detail = (f'<html><body><nav>メニュー</nav><main><h1>{pref} 映像制作業務</h1>'
+                          f'<p>令和8年度に実施する動画制作業務の企画提案を募集します。提出期限は令和8年3月31日です。</p>'
+                          f'<p>公告番号 第{serial}号 予算上限額 {1000000 + serial * 1000}円 '
+                          f'制作本数 {serial % 7 + 1}本 尺 {serial * 3 % 170 + 10}秒 '
+                          f'履行期限 令和{serial % 3 + 9}年{serial % 12 + 1}月{serial % 28 + 1}日 '
+                          f'担当 内線{2000 + serial}</p>'
+                          f'<p>{"業務の詳細は仕様書をご確認ください。" * 50}</p>'
+                          f'<a href="{base}/spec_{i}_{suffix}.pdf">仕様書</a></main></body></html>')
+                archive.put_response('GET', f"{base}/detail_{i}_{suffix}.html", 200, html_headers,
+                                     detail.encode('utf-8'))
+                archive.put_response('GET', f"{base}/spec_{i}_{suffix}.pdf", 200,
+                                     {'Content-Type': 'application/pdf'}, pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', help="main.py --record で記録したファイル（省略時は合成）")
+    parser.add_argument('--latency', type=float, default=0.0, help="1リクエストごとに足す通信遅延（ミリ秒）")
+    parser.add_argument('--workers', type=int, help="本文取得段の並列数（既定は PIPELINE_EXTRACT_WORKERS）")
+    parser.add_argument('--incremental', action='store_true', help="空の既読ストアを使い、差分実行の経路で計測する")
+    parser.add_argument('--keep-throttle', action='store_true', help="ホスト単位のレート制限を本番どおりに残す")
+    parser.add_argument('--json', help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    # 設定は読み込み時に確定するので、プロジェクトのモジュールより先に環境変数を決める
+    for name in ('PAGE_CACHE_ENABLED', 'ANALYSIS_CACHE_ENABLED', 'PDF_PAGE_CACHE_ENABLED', 'HOST_HEALTH_ENABLED'):
+        os.environ[name] = '0'
+    if not args.keep_throttle:
+        os.environ['CRAWL_PER_HOST_RATE'] = '1000000'
+        os.environ['CRAWL_PER_HOST_BURST'] = '1000000'
+
+    import logging
+    import main as app
+    from analyzer.ai_analyzer import AIAnalyzer
+    from analyzer.replay_client import ReplayAnthropicClient
+    from config import settings
+    from database.seen_store import SeenStore
+    from scrapers import direct_scraper
+    from scrapers.content_extractor import ContentExtractor
+    from utils.metrics import METRICS
+    from utils.near_duplicate import create_near_duplicate_index
+    from utils.replay import FixtureArchive, enable_replay
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    tmpdir = None
+    if args.fixtures:
+        archive = FixtureArchive(args.fixtures)
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        archive = FixtureArchive(os.path.join(tmpdir.name, 'synthetic.sqlite3'))
+        synth_archive(archive, direct_scraper.PREFECTURE_BID_PAGES)
+    counts = archive.counts()
+    print(f"記録: HTTP応答 {counts['responses']}件 / AI返答 {counts['analyses']}件")
+
+    adapter = enable_replay(archive, latency=args.latency / 1000)
+    timer = StageTimer()
+    # run_streaming_mode は各段からモジュールの関数を呼ぶので、そこを包んで計る
+    direct_scraper.scrape_prefecture_page = timer.wrap('巡回(1ページ)', direct_scraper.scrape_prefecture_page)
+    app.passes_title_gate = timer.wrap('タイトル門番', app.passes_title_gate)
+    app.analyze_task = timer.wrap('AI解析段', app.analyze_task)
+    extractor = ContentExtractor()
+    extractor.extract = timer.wrap('本文取得', extractor.extract)
+    analyzer = AIAnalyzer(client=ReplayAnthropicClient(archive))
+    analyzer.analyze_single = timer.wrap('AI解析', analyzer.analyze_single)
+    today = datetime.now(timezone(timedelta(hours=9))).date()
+    seen_store = None
+    if args.incremental:
+        seen_dir = tempfile.TemporaryDirectory()
+        seen_store = SeenStore(os.path.join(seen_dir.name, 'seen.sqlite3'), settings.INCREMENTAL_RECHECK_DAYS)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = app.run_streaming_mode(extractor, analyzer, today, seen_store,
+                                     args.workers or settings.PIPELINE_EXTRACT_WORKERS,
+                                     near_dups=create_near_duplicate_index())
+    total_seconds = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pages = len(timer.samples.get('巡回(1ページ)', []))
+    tasks = len(timer.samples.get('タイトル門番', []))
+
+    report = {
+        'mode': 'streaming',
+        'incremental': args.incremental,
+        'pages': pages,
+        'tasks': tasks,
+        'accepted': len(results),
+        'total_seconds': total_seconds,
+        'pages_per_sec': pages / total_seconds if total_seconds else 0.0,
+        'tasks_per_sec': tasks / total_seconds if total_seconds else 0.0,
+        'replay_hits': adapter.hits,
+        'replay_misses': adapter.misses,
+        'stages': timer.summary(),
+        'peak_traced_mb': peak_traced / 1e6,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'metrics': METRICS.summary(),
+    }
+
+    print(f"流れ作業モード: 通し {total_seconds:.2f}s / 巡回 {pages}ページ ({report['pages_per_sec']:.1f}ページ/秒) / "
+          f"選別 {tasks}タスク ({report['tasks_per_sec']:.1f}タスク/秒) → 採用 {report['accepted']}件")
+    print(f"再生: ヒット {adapter.hits} / 記録なし {adapter.misses} / "
+          f"受信 {report['metrics']['bytes_downloaded'] / 1e6:.1f}MB")
+    print(f"門番の除外数: {report['metrics']['counters'].get('gate_rejected', {})} / "
+          f"ほぼ同じ公告: {report['metrics']['counters'].get('near_duplicate', {})}")
+    for stage, s in report['stages'].items():
+        print(f"  {stage:<10} {s['count']:>6}回  p50 {s['p50_ms']:8.1f}ms  p95 {s['p95_ms']:8.1f}ms")
+    print(f"ピークメモリ: Python割当 {report['peak_traced_mb']:.1f}MB / 最大RSS {report['max_rss_mb']:.1f}MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if seen_store:
+        seen_store.conn.close()
+        seen_dir.cleanup()
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
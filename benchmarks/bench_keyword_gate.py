@@ -0,0 +1,126 @@
+"""門番キーワード判定のマイクロベンチマーク（従来の逐次 re.search / any(in) との比較）
+
+使い方:
+    python -m benchmarks.bench_keyword_gate [--titles titles.txt] [--repeat 50]
+
+--titles には実際の案件タイトルを1行1件で保存したファイルを渡す。
+省略時はよくあるタイトルの組み合わせから数千件を合成する。
+"""
+
+import argparse
+import random
+import re
+import time
+import unicodedata
+
+from utils.keyword_gate import LISTING_GATE, TASK_GATE
+
+_PARTS = [
+    "令和8年度", "令和7年度", "R8", "2026年度", "観光PR動画制作業務", "プロモーション映像作成業務委託",
+    "公募型プロポーザルの実施について", "企画提案競技", "入札公告", "選定結果の公表", "職員採用試験",
+    "ライブ配信業務", "撮影業務委託", "広報番組制作", "審査結果", "募集要項", "移住促進", "シティプロモーション",
+    "に係る", "の", "（再公告）", "【終了しました】", "質問への回答", "案件一覧(PDF)", "看護師募集",
+]
+
+
+def synth_titles(n, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(_PARTS) for _ in range(rng.randint(2, 5))) for _ in range(n)]
+
+
+# --- 従来実装（main.process_task / scrape_prefecture_page の判定部分をそのまま再現） ---
+def legacy_title_gate(url, title_raw):
+    if re.search(r"youtube\.com|youtu\.be|facebook\.com|instagram\.com|x\.com|twitter\.com", url): return False
+    if re.search(r"決定|公表|選定|落札|結果|審査|報告|実績|成功|達成|公開|完了|制作しました|放映中|配信中|終了", title_raw):
+        return False
+    if re.search(r"採用|職員|薬剤師|警察|教員|看護|医師|試験|相談|個人|講習", title_raw):
+        return False
+    if not re.search(r"募集|委託|入札|プロポーザル|コンペ|公募|企画提案|制作|作成|撮影|業務|動画|PR|プロモーション", title_raw):
+        return False
+    return True
+
+
+def legacy_listing_gate(combined_text):
+    video_keywords = ['動画', '映像', '配信', '撮影', 'プロモーション', '作成', '制作']
+    list_keywords = ['案件一覧', '募集一覧', '入札公告', '公募公告', '委託公告', '調達予定', '公募', '案件', '募集']
+    exclude_keywords = ["質問", "回答", "公表", "結果", "落札", "入札状況", "R6", "R7", "2024", "2025"]
+    is_video_link = any(k in combined_text for k in video_keywords)
+    is_list_pdf = any(lk in combined_text for lk in list_keywords) and "pdf" in combined_text.lower()
+    if is_video_link or is_list_pdf:
+        if any(ex in combined_text for ex in exclude_keywords) and "令和8" not in combined_text:
+            return False
+        return True
+    return False
+
+
+def legacy_fiscal_year_gate(normalized_text):
+    return re.search(r"令和[789]|R[789]|202[567]", normalized_text) is not None
+
+
+# --- 新実装（main.passes_title_gate / parse_listing_page / fetch_task と同じ判定） ---
+def gate_title_gate(url, title_raw):
+    if TASK_GATE.has(url, 'sns'): return False
+    if TASK_GATE.has(title_raw, 'closed'): return False
+    if TASK_GATE.has(title_raw, 'recruitment'): return False
+    return TASK_GATE.has(title_raw, 'creative')
+
+
+def gate_listing_gate(combined_text):
+    cats = LISTING_GATE.match(combined_text)
+    if 'video' in cats or ('list' in cats and "pdf" in combined_text.lower()):
+        return not ('exclude' in cats and 'reiwa8' not in cats)
+    return False
+
+
+def gate_fiscal_year_gate(normalized_text):
+    return TASK_GATE.has(normalized_text, 'fiscal_year')
+
+
+def bench(func, args_list, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', help="1行1タイトルのテキストファイル")
+    parser.add_argument('--n', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.titles:
+        with open(args.titles, encoding='utf-8') as f:
+            titles = [unicodedata.normalize('NFKC', line.strip()) for line in f if line.strip()]
+    else:
+        titles = synth_titles(args.n)
+
+    title_args = [("https://www.city.example.lg.jp/doc/1.html", t) for t in titles]
+    # 一覧ページでは「リンク文字列＋親要素の文字列」を判定するので、周辺の文字列も付けて長くする
+    listing_args = [(t + "　".join(titles[i - 3:i]),) for i, t in enumerate(titles)]
+    # 本文の年度検閲は数千文字のページに対して行う（年度表記が後ろの方にしか無いページを想定）
+    body_args = [("".join(titles[i:i + 150]).replace("令和", "平成").replace("R", "Q") + t,)
+                 for i, t in enumerate(titles[:200])]
+
+    # 判定結果が従来と一致することを先に確認
+    assert [legacy_title_gate(*a) for a in title_args] == [gate_title_gate(*a) for a in title_args]
+    assert [legacy_listing_gate(*a) for a in listing_args] == [gate_listing_gate(*a) for a in listing_args]
+    assert [legacy_fiscal_year_gate(*a) for a in body_args] == [gate_fiscal_year_gate(*a) for a in body_args]
+
+    print(f"タイトル数: {len(titles)}")
+    for name, legacy, new, data in [
+        ("タイトル門番", legacy_title_gate, gate_title_gate, title_args),
+        ("一覧ページ判定", legacy_listing_gate, gate_listing_gate, listing_args),
+        ("本文の年度検閲", legacy_fiscal_year_gate, gate_fiscal_year_gate, body_args),
+    ]:
+        t_old = bench(legacy, data, args.repeat)
+        t_new = bench(new, data, args.repeat)
+        print(f"{name}: 従来 {t_old * 1e3:.2f}ms / 新 {t_new * 1e3:.2f}ms (x{t_old / t_new:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""一覧ページ解析の比較ベンチマーク（BeautifulSoup版 / lxml版）
+
+使い方:
+    python -m benchmarks.bench_listing_parser --save path/to/pages   # 大きい一覧ページを保存（要ネット接続）
+    python -m benchmarks.bench_listing_parser --dir path/to/pages [--repeat 5]
+
+--save は東京都・大阪府・北海道の一覧ページを取得して <都道府県>_<連番>.html として保存する
+（URLは同名の .url ファイルに残す）。--dir 省略時は数千リンク規模の一覧ページを合成して計測する。
+各解析器の毎秒ページ数を表示し、両者の抽出結果（リンク・ページネーション）が一致するかも確認する。
+"""
+
+import argparse
+import glob
+import os
+import random
+import time
+
+from scrapers.direct_scraper import LISTING_PARSERS, PREFECTURE_BID_PAGES
+from utils.http_client import get_session
+
+BIG_LISTING_PREFS = ["東京都", "大阪府", "北海道"]
+
+
+def save_pages(directory):
+    os.makedirs(directory, exist_ok=True)
+    for pref in BIG_LISTING_PREFS:
+        for i, url in enumerate(PREFECTURE_BID_PAGES[pref]):
+            try:
+                response = get_session().get(url, timeout=30, verify=False)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"取得失敗: {url} - {e}")
+                continue
+            base = os.path.join(directory, f"{pref}_{i}")
+            with open(base + '.html', 'wb') as f:
+                f.write(response.content)
+            with open(base + '.url', 'w', encoding='utf-8') as f:
+                f.write(url)
+            print(f"保存: {base}.html ({len(response.content) / 1e3:.0f}KB)")
+
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        url_path = path[:-len('.html')] + '.url'
+        url = open(url_path, encoding='utf-8').read().strip() if os.path.exists(url_path) else "https://example.lg.jp/list/"
+        with open(path, 'rb') as f:
+            pages.append((url, f.read()))
+    return pages
+
+
+def synth_pages(n_pages=3, n_rows=3000):
+    rng = random.Random(0)
+    words = ["動画制作業務委託", "入札公告", "令和8年度", "落札結果", "PDF", "R7", "庁舎清掃", "公募", "説明会", "質問回答"]
+    pages = []
+    for p in range(n_pages):
+        rows = []
+        for i in range(n_rows):
+            label = "".join(rng.sample(words, 2))
+            # 1つのセルにリンクが多数並ぶ（親要素の文字を何度も作り直すと遅くなる形）
+            links = "".join(f'<a href="/doc/{p}/{i}_{k}.pdf">{label}{k}（PDF）</a>' for k in range(3))
+            rows.append(f"<tr><td>{i}</td><td>{links}<!-- memo --></td></tr>")
+        pager = "".join(f'<a href="?page={n}">{n}</a>' for n in range(2, 8)) + '<a href="?page=2">次へ&gt;</a>'
+        html = (f'<html><head><meta charset="utf-8"><script>var a = "映像";</script></head><body>'
+                f'<table>{"".join(rows)}</table><div class="pager">{pager}</div></body></html>')
+        pages.append((f"https://www.pref.example.lg.jp/list/{p}/", html.encode('utf-8')))
+    return pages
+
+
+def time_parser(parse, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, content in pages:
+            parse(content, url)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', help="保存済み一覧ページのフォルダ")
+    parser.add_argument('--save', help="一覧ページを取得して保存するフォルダ")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+        return
+
+    pages = load_pages(args.dir) if args.dir else synth_pages()
+    total_mb = sum(len(content) for _, content in pages) / 1e6
+    print(f"一覧ページ数: {len(pages)} ({total_mb:.1f}MB)")
+
+    for url, content in pages:
+        expected = LISTING_PARSERS['bs4'](content, url)
+        actual = LISTING_PARSERS['lxml'](content, url)
+        status = "一致" if expected == actual else "不一致"
+        print(f"  {url}: リンク {len(expected['results'])}/{len(actual['results'])} "
+              f"ページ送り {len(expected['pagination'])}/{len(actual['pagination'])} {status}")
+
+    for name, parse in LISTING_PARSERS.items():
+        elapsed = time_parser(parse, pages, args.repeat)
+        print(f"{name:>5}: {elapsed:.3f}s ({len(pages) / elapsed:.1f}ページ/秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""本文抽出の解析プロセスプール有無の比較ベンチマーク
+
+使い方:
+    python -m benchmarks.bench_parse_pool [--pages 40] [--threads 10] [--processes 4]
+
+ローカルHTTPサーバーで公告ページ風のHTMLと添付PDFを配信し、
+ContentExtractor を「スレッド内で解析」と「プロセスプールで解析」の2通りで回して、
+全体の所要時間と通信（io）・解析（cpu）の内訳を表示する。
+解析はGILに縛られるので、コア数の多いランナーほどプロセスプール側の差が開く。
+"""
+
+import os
+
+# 2回目以降の計測がキャッシュヒットにならないよう、子プロセスにも引き継がれる環境変数で切る
+os.environ['PDF_PAGE_CACHE_ENABLED'] = '0'
+
+import argparse
+import functools
+import http.server
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapers.content_extractor import ContentExtractor
+from scrapers.parse_pool import create_parse_pool
+
+
+def build_site(root, n_pages, pdfs_per_page=2, pdf_pages=20):
+    import fitz
+    for i in range(n_pages * pdfs_per_page):
+        doc = fitz.open()
+        for p in range(pdf_pages):
+            page = doc.new_page()
+            lines = [f"Spec {i} page {p}"] + [f"Item {k}: lorem ipsum dolor sit amet" for k in range(40)]
+            page.insert_text((50, 50), "\n".join(lines), fontsize=9)
+        doc.save(os.path.join(root, f"spec_{i}.pdf"))
+        doc.close()
+    rows = "".join(f"<tr><td>項目{k}</td><td>映像制作業務委託の説明文{k}</td></tr>" for k in range(1500))
+    for i in range(n_pages):
+        links = "".join(f'<a href="spec_{i * pdfs_per_page + j}.pdf">仕様書{j}</a>'
+                        for j in range(pdfs_per_page))
+        html = (f"<html><head><script>var x = 1;</script></head><body><nav>メニュー</nav>"
+                f"<main><h1>公募 {i}</h1><table>{rows}</table>{links}</main><footer>フッター</footer></body></html>")
+        with open(os.path.join(root, f"page_{i}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def run(base_url, n_pages, threads, parse_pool):
+    extractor = ContentExtractor(parse_pool=parse_pool)
+    urls = [f"{base_url}/page_{i}.html" for i in range(n_pages)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(extractor.extract, urls))
+    elapsed = time.perf_counter() - start
+    chars = sum(len(r['content']) for r in results if r)
+    return elapsed, extractor.timing_stats(), chars
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_site(root, args.pages)
+        server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), functools.partial(QuietHandler, directory=root))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(f"ページ数: {args.pages} / 取得スレッド: {args.threads} / CPU: {os.cpu_count()}")
+
+        pool = create_parse_pool(args.processes)
+        # プロセス起動とモジュール読み込みは計測から外す
+        run(base_url, 2, args.threads, pool)
+        try:
+            for label, parse_pool in (("スレッド内解析", None), (f"プロセス{args.processes}", pool)):
+                elapsed, timings, chars = run(base_url, args.pages, args.threads, parse_pool)
+                print(f"{label:>12}: 全体 {elapsed:.2f}s / 通信 {timings['io']:.2f}s / "
+                      f"解析 {timings['cpu']:.2f}s（スレッド累計） / {chars}文字")
+        finally:
+            if pool:
+                pool.shutdown()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,3 +14,31 @@ RELATED_KEYWORDS = [
     "撮影",
     "配信",
 ]
+
+# --- 門番（main.process_task）用のカテゴリ別キーワード ---
+TASK_GATE_KEYWORDS = {
+    # 門番1：SNS（URLに対して判定）
+    "sns": ["youtube.com", "youtu.be", "facebook.com", "instagram.com", "x.com", "twitter.com"],
+    # 門番1：終了・結果報告系のタイトル
+    "closed": ["決定", "公表", "選定", "落札", "結果", "審査", "報告", "実績", "成功", "達成", "公開", "完了",
+               "制作しました", "放映中", "配信中", "終了"],
+    # 門番1：人材募集系のタイトル
+    "recruitment": ["採用", "職員", "薬剤師", "警察", "教員", "看護", "医師", "試験", "相談", "個人", "講習"],
+    # 門番2：クリエイティブ案件キーワード
+    "creative": ["募集", "委託", "入札", "プロポーザル", "コンペ", "公募", "企画提案", "制作", "作成", "撮影",
+                 "業務", "動画", "PR", "プロモーション"],
+    # 門番3：年度検閲（令和7〜9年度 / 2025〜2027年）
+    "fiscal_year": ["令和7", "令和8", "令和9", "R7", "R8", "R9", "2025", "2026", "2027"],
+}
+
+# --- 一覧ページ（scrape_prefecture_page）用のカテゴリ別キーワード ---
+LISTING_GATE_KEYWORDS = {
+    # 映像制作そのものを指す言葉
+    "video": ["動画", "映像", "配信", "撮影", "プロモーション", "作成", "制作"],
+    # 【お宝救済用】案件がまとまって入っている可能性があるリスト系キーワード
+    "list": ["案件一覧", "募集一覧", "入札公告", "公募公告", "委託公告", "調達予定", "公募", "案件", "募集"],
+    # 除外キーワード（これらのみの場合はスルー）
+    "exclude": ["質問", "回答", "公表", "結果", "落札", "入札状況", "R6", "R7", "2024", "2025"],
+    # 除外からの救済
+    "reiwa8": ["令和8"],
+}
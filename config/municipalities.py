@@ -0,0 +1,146 @@
+"""巡回先の自治体一覧（config/municipalities.json から読み込む）
+
+自治体を足すときはJSONに1行足すだけでよい（コードの修正は不要）。
+- 定義順が巡回結果の並び順（重複排除の優先順位）になる
+- ホスト名 → 自治体、都道府県 → 市区町村 の索引を持つ
+- shard(k, n) で n 分割した k 番目だけを取り出せる（CIの複数ジョブ・複数マシンで分担して巡回するため）
+"""
+
+import json
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import settings
+
+# kind の種類
+KINDS = ('prefecture', 'designated_city', 'special_ward', 'municipality')
+
+
+class Municipality:
+    __slots__ = ('order', 'name', 'prefecture', 'kind', 'urls', 'domain', 'hosts')
+
+    def __init__(self, order: int, name: str, prefecture: str, kind: str, urls: List[str],
+                 domain: Optional[str] = None):
+        self.order = order            # 定義順の通し番号（分担しても変わらない）
+        self.name = name
+        self.prefecture = prefecture
+        self.kind = kind
+        self.urls = list(urls)
+        self.domain = domain          # 都道府県の公式ドメイン（Google救済の絞り込み等）
+        self.hosts = list(dict.fromkeys(urlsplit(u).netloc.lower() for u in self.urls))
+
+    @property
+    def primary_host(self) -> str:
+        return self.hosts[0] if self.hosts else ''
+
+    def __repr__(self):
+        return f"Municipality({self.order}, {self.name!r}, {self.prefecture!r}, {self.kind!r})"
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'k/N'（1始まり）を (k, N) にする"""
+    try:
+        k, n = (int(x) for x in text.split('/'))
+    except ValueError:
+        raise ValueError(f"分担の指定は k/N の形式で書いてください: {text!r}")
+    if not 1 <= k <= n:
+        raise ValueError(f"分担の番号が範囲外です: {text!r}")
+    return k, n
+
+
+class MunicipalityRegistry:
+    def __init__(self, entries: List[Municipality]):
+        self.entries = entries
+        self._by_name: Dict[str, Municipality] = {}
+        self._by_host: Dict[str, Municipality] = {}
+        self._by_prefecture: Dict[str, List[Municipality]] = {}
+        for m in entries:
+            if m.name in self._by_name:
+                raise ValueError(f"自治体名が重複しています: {m.name}")
+            if m.kind not in KINDS:
+                raise ValueError(f"{m.name}: 不明な種別 {m.kind!r}")
+            self._by_name[m.name] = m
+            # 同じホストを複数の自治体が使う場合は先に定義した方を優先
+            for host in m.hosts:
+                self._by_host.setdefault(host, m)
+            self._by_prefecture.setdefault(m.prefecture, []).append(m)
+
+    @classmethod
+    def load(cls, path: str) -> 'MunicipalityRegistry':
+        with open(path, encoding='utf-8') as f:
+            rows = json.load(f)
+        return cls([Municipality(i, r['name'], r['prefecture'], r['kind'], r['urls'], r.get('domain'))
+                    for i, r in enumerate(rows)])
+
+    def __iter__(self) -> Iterator[Municipality]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> Optional[Municipality]:
+        return self._by_name.get(name)
+
+    def by_host(self, host_or_url: str) -> Optional[Municipality]:
+        """ホスト名（またはURL）からその自治体を引く"""
+        host = urlsplit(host_or_url).netloc if '//' in host_or_url else host_or_url
+        return self._by_host.get(host.lower())
+
+    def cities_in(self, prefecture: str) -> List[Municipality]:
+        """都道府県内の市区町村（都道府県そのものは除く）"""
+        return [m for m in self._by_prefecture.get(prefecture, []) if m.kind != 'prefecture']
+
+    def prefectures(self) -> List[Municipality]:
+        return [m for m in self.entries if m.kind == 'prefecture']
+
+    def shard(self, k: int, n: int) -> List[Municipality]:
+        """n 分割した k 番目（1始まり）の自治体を定義順で返す
+
+        ホストを1つでも共有する自治体は（2つ目以降のURLのホストも含めて）必ず同じ分担に入れる
+        （ホスト単位の礼儀を分担をまたいで破らないため）。
+        ホストでつながったまとまりを定義順に1つずつ配っていくので、分担ごとの件数はほぼ均等になる。
+        """
+        if not 1 <= k <= n:
+            raise ValueError(f"分担の番号が範囲外です: {k}/{n}")
+        groups = self._host_groups()
+        return [m for m in self.entries if groups[m.order] % n == k - 1]
+
+    def _host_groups(self) -> List[int]:
+        """定義順の番号 → ホストでつながったまとまりの番号（まとまりが初めて現れた順に 0, 1, ...）"""
+        parent = list(range(len(self.entries)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        owner: Dict[str, int] = {}
+        for m in self.entries:
+            for host in m.hosts:
+                if host in owner:
+                    a, b = find(owner[host]), find(m.order)
+                    # 先に定義された方を代表にする（番号の振り方を定義順に保つ）
+                    parent[max(a, b)] = min(a, b)
+                else:
+                    owner[host] = m.order
+        numbers: Dict[int, int] = {}
+        return [numbers.setdefault(find(m.order), len(numbers)) for m in self.entries]
+
+    def as_bid_pages(self) -> Dict[str, List[str]]:
+        """旧来の PREFECTURE_BID_PAGES と同じ {自治体名: 開始URLリスト} の形"""
+        return {m.name: list(m.urls) for m in self.entries}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MunicipalityRegistry:
+    """プロセス内で1つだけの自治体一覧（初めて使うときに読み込む）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MunicipalityRegistry.load(settings.MUNICIPALITIES_PATH)
+        return _registry
@@ -1,192 +1,9 @@
-"""47都道府県の公式ドメインリスト"""
+"""47都道府県の公式ドメインリスト（config/municipalities.json の都道府県から組み立てる）"""
 
-PREFECTURES = {
-    "北海道": {
-        "name": "北海道",
-        "domain": "pref.hokkaido.lg.jp",
-    },
-    "青森県": {
-        "name": "青森県",
-        "domain": "pref.aomori.lg.jp",
-    },
-    "岩手県": {
-        "name": "岩手県",
-        "domain": "pref.iwate.jp",
-    },
-    "宮城県": {
-        "name": "宮城県",
-        "domain": "pref.miyagi.jp",
-    },
-    "秋田県": {
-        "name": "秋田県",
-        "domain": "pref.akita.lg.jp",
-    },
-    "山形県": {
-        "name": "山形県",
-        "domain": "pref.yamagata.jp",
-    },
-    "福島県": {
-        "name": "福島県",
-        "domain": "pref.fukushima.lg.jp",
-    },
-    "茨城県": {
-        "name": "茨城県",
-        "domain": "pref.ibaraki.jp",
-    },
-    "栃木県": {
-        "name": "栃木県",
-        "domain": "pref.tochigi.lg.jp",
-    },
-    "群馬県": {
-        "name": "群馬県",
-        "domain": "pref.gunma.jp",
-    },
-    "埼玉県": {
-        "name": "埼玉県",
-        "domain": "pref.saitama.lg.jp",
-    },
-    "千葉県": {
-        "name": "千葉県",
-        "domain": "pref.chiba.lg.jp",
-    },
-    "東京都": {
-        "name": "東京都",
-        "domain": "metro.tokyo.lg.jp",
-    },
-    "神奈川県": {
-        "name": "神奈川県",
-        "domain": "pref.kanagawa.jp",
-    },
-    "新潟県": {
-        "name": "新潟県",
-        "domain": "pref.niigata.lg.jp",
-    },
-    "富山県": {
-        "name": "富山県",
-        "domain": "pref.toyama.jp",
-    },
-    "石川県": {
-        "name": "石川県",
-        "domain": "pref.ishikawa.lg.jp",
-    },
-    "福井県": {
-        "name": "福井県",
-        "domain": "pref.fukui.lg.jp",
-    },
-    "山梨県": {
-        "name": "山梨県",
-        "domain": "pref.yamanashi.jp",
-    },
-    "長野県": {
-        "name": "長野県",
-        "domain": "pref.nagano.lg.jp",
-    },
-    "岐阜県": {
-        "name": "岐阜県",
-        "domain": "pref.gifu.lg.jp",
-    },
-    "静岡県": {
-        "name": "静岡県",
-        "domain": "pref.shizuoka.jp",
-    },
-    "愛知県": {
-        "name": "愛知県",
-        "domain": "pref.aichi.jp",
-    },
-    "三重県": {
-        "name": "三重県",
-        "domain": "pref.mie.lg.jp",
-    },
-    "滋賀県": {
-        "name": "滋賀県",
-        "domain": "pref.shiga.lg.jp",
-    },
-    "京都府": {
-        "name": "京都府",
-        "domain": "pref.kyoto.jp",
-    },
-    "大阪府": {
-        "name": "大阪府",
-        "domain": "pref.osaka.lg.jp",
-    },
-    "兵庫県": {
-        "name": "兵庫県",
-        "domain": "pref.hyogo.lg.jp",
-    },
-    "奈良県": {
-        "name": "奈良県",
-        "domain": "pref.nara.jp",
-    },
-    "和歌山県": {
-        "name": "和歌山県",
-        "domain": "pref.wakayama.lg.jp",
-    },
-    "鳥取県": {
-        "name": "鳥取県",
-        "domain": "pref.tottori.lg.jp",
-    },
-    "島根県": {
-        "name": "島根県",
-        "domain": "pref.shimane.lg.jp",
-    },
-    "岡山県": {
-        "name": "岡山県",
-        "domain": "pref.okayama.jp",
-    },
-    "広島県": {
-        "name": "広島県",
-        "domain": "pref.hiroshima.lg.jp",
-    },
-    "山口県": {
-        "name": "山口県",
-        "domain": "pref.yamaguchi.lg.jp",
-    },
-    "徳島県": {
-        "name": "徳島県",
-        "domain": "pref.tokushima.lg.jp",
-    },
-    "香川県": {
-        "name": "香川県",
-        "domain": "pref.kagawa.lg.jp",
-    },
-    "愛媛県": {
-        "name": "愛媛県",
-        "domain": "pref.ehime.jp",
-    },
-    "高知県": {
-        "name": "高知県",
-        "domain": "pref.kochi.lg.jp",
-    },
-    "福岡県": {
-        "name": "福岡県",
-        "domain": "pref.fukuoka.lg.jp",
-    },
-    "佐賀県": {
-        "name": "佐賀県",
-        "domain": "pref.saga.lg.jp",
-    },
-    "長崎県": {
-        "name": "長崎県",
-        "domain": "pref.nagasaki.jp",
-    },
-    "熊本県": {
-        "name": "熊本県",
-        "domain": "pref.kumamoto.jp",
-    },
-    "大分県": {
-        "name": "大分県",
-        "domain": "pref.oita.jp",
-    },
-    "宮崎県": {
-        "name": "宮崎県",
-        "domain": "pref.miyazaki.lg.jp",
-    },
-    "鹿児島県": {
-        "name": "鹿児島県",
-        "domain": "pref.kagoshima.jp",
-    },
-    "沖縄県": {
-        "name": "沖縄県",
-        "domain": "pref.okinawa.jp",
-    }
-}
+from config.municipalities import get_registry
+
+
+def __getattr__(name):
+    if name == 'PREFECTURES':
+        return {m.name: {"name": m.name, "domain": m.domain} for m in get_registry().prefectures()}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
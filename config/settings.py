@@ -5,17 +5,73 @@ import os
 # スプレッドシート設定
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '')
 CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
+SHEETS_WRITE_CHUNK_ROWS = int(os.getenv('SHEETS_WRITE_CHUNK_ROWS', '500'))   # 1回の batch_update で書く最大行数
+SHEETS_MAX_RETRIES = int(os.getenv('SHEETS_MAX_RETRIES', '5'))              # 割り当て超過(429)・5xx のときの再試行回数
 
 # スクレイピング設定
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 1
 MAX_RETRIES = 3
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.5'))    # リトライ間隔の係数（0.5, 1, 2秒...）
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '1000'))           # 保持するホスト別接続プールの数
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '4'))        # 1ホストあたりの最大接続数
+
+# 巡回エンジン設定（並列数とホスト単位の礼儀）
+CRAWL_MAX_WORKERS = int(os.getenv('CRAWL_MAX_WORKERS', '16'))          # 全体の同時巡回数
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv('CRAWL_PER_HOST_CONCURRENCY', '2'))  # 1ホストあたりの同時接続数
+CRAWL_PER_HOST_RATE = float(os.getenv('CRAWL_PER_HOST_RATE', '2.0'))   # 1ホストあたりの毎秒リクエスト数
+CRAWL_PER_HOST_BURST = int(os.getenv('CRAWL_PER_HOST_BURST', '2'))     # トークンバケットの容量
+HOST_HEALTH_ENABLED = os.getenv('HOST_HEALTH_ENABLED', '1') == '1'         # ホストの調子に合わせた頻度調整と回路遮断
+HOST_FAILURE_THRESHOLD = int(os.getenv('HOST_FAILURE_THRESHOLD', '3'))     # この回数連続で失敗したら回路を開く
+HOST_COOLDOWN_SECONDS = float(os.getenv('HOST_COOLDOWN_SECONDS', str(6 * 3600)))  # 回路を開いておく時間（開くたびに倍）
+HOST_PROBE_TIMEOUT = float(os.getenv('HOST_PROBE_TIMEOUT', '5'))           # 失敗歴のあるホストへのタイムアウト（秒）
+HOST_SLOW_SECONDS = float(os.getenv('HOST_SLOW_SECONDS', '5'))             # 平均応答がこれより遅いホストは1本ずつ
+LISTING_PARSER = os.getenv('LISTING_PARSER', 'lxml')                  # 一覧ページの解析器 lxml（高速） / bs4
+MUNICIPALITIES_PATH = os.getenv('MUNICIPALITIES_PATH', os.path.join(os.path.dirname(__file__), 'municipalities.json'))  # 巡回先の自治体一覧
+SHARD_OUTPUT_DIR = os.getenv('SHARD_OUTPUT_DIR', 'shards')            # 分担巡回（--shard k/N）の中間ファイルの置き場所
+
+# キャッシュ設定（実行間で持ち越すデータの保存先）
+CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+PROJECT_STORE_PATH = os.getenv('PROJECT_STORE_PATH', os.path.join(CACHE_DIR, 'projects.sqlite3'))  # 案件の正本（シートはここからの書き出し先）
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', '1') == '1'
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+INCREMENTAL_RECHECK_DAYS = float(os.getenv('INCREMENTAL_RECHECK_DAYS', '0'))  # 差分実行で本文の再取得まで省略する日数（0 なら毎回取得してハッシュで判定）
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', '1') == '1'
+ANALYSIS_CACHE_TTL_DAYS = float(os.getenv('ANALYSIS_CACHE_TTL_DAYS', '7'))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '20000'))
+
+# 流れ作業パイプライン設定（段ごとのワーカー数とキュー長）
+PIPELINE_EXTRACT_WORKERS = int(os.getenv('PIPELINE_EXTRACT_WORKERS', '10'))
+PIPELINE_ANALYZE_WORKERS = int(os.getenv('PIPELINE_ANALYZE_WORKERS', '10'))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '100'))
+
+# 非同期本文抽出（--async-extract）設定
+ASYNC_EXTRACT_CONCURRENCY = int(os.getenv('ASYNC_EXTRACT_CONCURRENCY', '100'))  # 同時に飛ばすリクエスト数
+ASYNC_EXTRACT_MAX_PDFS = int(os.getenv('ASYNC_EXTRACT_MAX_PDFS', '8'))         # 1ページあたりに同時取得するPDF数
+
+# PDFテキスト抽出設定
+PDF_TEXT_ENGINE = os.getenv('PDF_TEXT_ENGINE', 'pymupdf')              # pymupdf（高速） / pdfplumber
+PDF_PAGE_CACHE_ENABLED = os.getenv('PDF_PAGE_CACHE_ENABLED', '1') == '1'
+PDF_PAGE_CACHE_MAX_BYTES = int(os.getenv('PDF_PAGE_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))  # 超えたら古いPDFから追い出す
+PDF_MAX_DOWNLOAD_BYTES = int(os.getenv('PDF_MAX_DOWNLOAD_BYTES', str(30 * 1024 * 1024)))  # これ以上は読まない
+PDF_SPOOL_BYTES = int(os.getenv('PDF_SPOOL_BYTES', str(4 * 1024 * 1024)))  # これを超えたら一時ファイルへ逃がす
+
+# 解析用プロセスプール設定（0 なら取得スレッド内で解析する）
+PARSE_PROCESSES = int(os.getenv('PARSE_PROCESSES', '0'))  # HTML/PDF解析に使うプロセス数
+
+# AI解析設定
+BATCH_POLL_INTERVAL = float(os.getenv('BATCH_POLL_INTERVAL', '30'))  # バッチ完了確認の間隔（秒）
+NEAR_DUP_ENABLED = os.getenv('NEAR_DUP_ENABLED', '1') == '1'             # ほぼ同じ公告はAI解析を1回にまとめる
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', '0.8'))       # 同じ案件とみなす本文の一致率（0〜1）
+NEAR_DUP_MIN_CHARS = int(os.getenv('NEAR_DUP_MIN_CHARS', '200'))         # これより短い本文は判定しない
+NEAR_DUP_WAIT_SECONDS = float(os.getenv('NEAR_DUP_WAIT_SECONDS', '600'))  # フォロワーがリーダーの解析を待つ上限
 
 # ログ設定
 LOG_LEVEL = 'INFO'
 LOG_FILE = 'logs/scraping.log'
+METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH', 'logs/run_metrics.json')  # 実行ごとの計測結果（JSON）
+METRICS_PROMETHEUS_PATH = os.getenv('METRICS_PROMETHEUS_PATH', '')       # Prometheus textfile の出力先（空なら出さない）
 
 # 検索エンジン設定
 SEARCH_ENGINE = 'duckduckgo'
-```
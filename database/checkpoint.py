@@ -0,0 +1,99 @@
+"""実行途中の進み具合の記録（落ちた・止められた実行を --resume で続きから再開するため）
+
+巡回を終えた自治体・本文取得の結果・AI解析の結果を、終わった順に1行ずつ JSONL に追記する。
+再開時はこの記録を読み戻し、済んでいる巡回・取得・解析を飛ばす。
+最後まで終わった実行は 'done' 行を書くので、次の --resume は最初からやり直しになる。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointLog:
+    def __init__(self, path: str, run_key: Dict, resume: bool = False):
+        """run_key が前回と同じ（同じ分担・同じモード）で、前回が途中で終わっていれば続きから"""
+        self.path = path
+        self.lock = threading.Lock()
+        self.crawled: Dict[int, Dict] = {}     # 定義順の番号 → {'pref', 'results'}
+        self.extracted: Dict[str, Optional[Dict]] = {}  # URL → 取得結果（門番で落ちたものは None）
+        self.analyses: Dict[str, Dict] = {}    # URL → AI解析結果
+        self.resumed = resume and self._load(run_key)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'a' if self.resumed else 'w', encoding='utf-8')
+        if self.resumed:
+            logger.info(f"⏯️ 前回の続きから再開: 巡回済み {len(self.crawled)}自治体 / "
+                        f"取得済み {len(self.extracted)}件 / 解析済み {len(self.analyses)}件")
+        else:
+            self._append({'type': 'run', 'key': run_key, 'started_at': time.time()})
+
+    def _load(self, run_key: Dict) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.readlines()
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # 書き込み途中で止まった最後の行は捨てる
+                continue
+        if not records or records[0].get('type') != 'run' or records[0].get('key') != run_key:
+            logger.info("⏯️ 条件の合う途中記録が無いため最初から実行します")
+            return False
+        if records[-1].get('type') == 'done':
+            logger.info("⏯️ 前回の実行は完了しているため最初から実行します")
+            return False
+        for r in records[1:]:
+            kind = r.get('type')
+            if kind == 'crawl':
+                self.crawled[r['order']] = {'pref': r['pref'], 'results': r['results']}
+            elif kind == 'extract':
+                self.extracted[r['url']] = r['prepared']
+            elif kind == 'analysis':
+                self.analyses[r['url']] = r['analysis']
+        return True
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    # --- 巡回 ---
+    def record_crawl(self, order: int, pref: str, results):
+        self._append({'type': 'crawl', 'order': order, 'pref': pref, 'results': results})
+
+    # --- 本文取得（task を除いた fetch_task の戻り値） ---
+    def has_extract(self, url: str) -> bool:
+        return url in self.extracted
+
+    def get_extract(self, url: str) -> Optional[Dict]:
+        """None は「年度検閲で落ちた」という記録"""
+        return self.extracted.get(url)
+
+    def record_extract(self, url: str, prepared: Optional[Dict]):
+        self._append({'type': 'extract', 'url': url, 'prepared': prepared})
+
+    # --- AI解析 ---
+    def get_analysis(self, url: str) -> Optional[Dict]:
+        return self.analyses.get(url)
+
+    def record_analysis(self, url: str, analysis: Dict):
+        self._append({'type': 'analysis', 'url': url, 'analysis': analysis})
+
+    def finish(self):
+        """最後まで終わった印を付けて閉じる"""
+        self._append({'type': 'done', 'finished_at': time.time()})
+        self.close()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
@@ -0,0 +1,184 @@
+"""ダッシュボード用のデータ層（月ごとのシートを必要になった月だけ読み、2回目以降は追記分だけ取る）
+
+- 月シートは選ばれたときに初めて読み込む（過去の月まで毎回読まない）
+- 読み込み済みの月は「読んだ行数」を覚えておき、その次の行からだけを取得する
+- 行の上書き（upsert による内容の更新）は一定時間ごとの全件読み直しで拾う
+- 返す DataFrame は件名以外の繰り返しの多い列をカテゴリ型に、締切を日付型にそろえる
+- 絞り込み（filter_projects）と集計（aggregate）もここで行い、画面には結果だけを渡す
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from database.sheets_manager import SheetsManager
+
+logger = logging.getLogger(__name__)
+
+# main.py が書き出すシート名（月ごと）
+SHEET_NAME_FORMAT = "映像案件_%Y年%m月_v16"
+_SHEET_NAME = re.compile(r'^映像案件_(\d{4})年(\d{2})月_v16$')
+
+CATEGORY_COLUMNS = ('ラベル', '発注主体', '都道府県/市区町村', '方式', 'タグ')
+DEADLINE_COLUMNS = ('締切(参加申込)', '締切(質問)', '締切(提案書)')
+_DATE_PATTERN = r'(\d{4})[-/年](\d{1,2})[-/月](\d{1,2})'
+
+
+def sheet_name(month: str) -> str:
+    """'YYYY-MM' → シート名"""
+    return datetime.strptime(month, "%Y-%m").strftime(SHEET_NAME_FORMAT)
+
+
+def month_of_sheet(title: str) -> Optional[str]:
+    m = _SHEET_NAME.match(title)
+    return f"{m.group(1)}-{m.group(2)}" if m else None
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """「2026年3月31日」「2026/03/31」などの文字列を日付型に（読めないものは NaT）"""
+    parts = values.astype(str).str.extract(_DATE_PATTERN)
+    return pd.to_datetime(
+        parts[0] + '-' + parts[1].str.zfill(2) + '-' + parts[2].str.zfill(2),
+        format='%Y-%m-%d', errors='coerce')
+
+
+def to_typed_frame(rows: List[List[str]], month: str) -> pd.DataFrame:
+    """シートの行（ヘッダー除く）を型付きの DataFrame にする"""
+    width = len(SheetsManager.HEADER)
+    df = pd.DataFrame([(r + [''] * width)[:width] for r in rows], columns=SheetsManager.HEADER, dtype=str)
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    for column in DEADLINE_COLUMNS:
+        df[column] = parse_dates(df[column])
+    # 参加申込・提案書の締切のうち遅い方（絞り込み・集計の基準）
+    df['締切'] = df[['締切(参加申込)', '締切(提案書)']].max(axis=1)
+    df['月'] = month
+    return df
+
+
+class SheetSource:
+    """スプレッドシートから月シートの行を読む"""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._worksheets = {}
+
+    def months(self) -> List[str]:
+        found = (month_of_sheet(ws.title) for ws in self.spreadsheet.worksheets())
+        return sorted((m for m in found if m), reverse=True)
+
+    def fetch_rows(self, month: str, start_row: int) -> List[List[str]]:
+        """start_row 行目（1始まり）以降の行を返す（シートが無ければ空）"""
+        import gspread
+        ws = self._worksheets.get(month)
+        if ws is None:
+            try:
+                ws = self._worksheets[month] = self.spreadsheet.worksheet(sheet_name(month))
+            except gspread.exceptions.WorksheetNotFound:
+                return []
+        return ws.get(f"A{start_row}:P")
+
+
+class DashboardData:
+    """月ごとの読み込み済み行と、型付き DataFrame を持ち回す（プロセス内で1つ）"""
+
+    def __init__(self, source, full_reload_seconds: float = 3600):
+        self.source = source
+        self.full_reload_seconds = full_reload_seconds
+        self.lock = threading.Lock()
+        self.rows: Dict[str, List[List[str]]] = {}
+        self.loaded_at: Dict[str, float] = {}
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.version = 0  # 中身が変わるたびに増える（表示側のキャッシュの鍵）
+
+    def months(self) -> List[str]:
+        return self.source.months()
+
+    def refresh(self, months: List[str]) -> int:
+        """選ばれた月を最新にして、データの版番号を返す"""
+        with self.lock:
+            for month in months:
+                self._refresh_month(month)
+            return self.version
+
+    def _refresh_month(self, month: str):
+        rows = self.rows.get(month)
+        if rows is None or time.time() - self.loaded_at[month] > self.full_reload_seconds:
+            # 初回・定期の全件読み直し（1行目はヘッダー）
+            values = self.source.fetch_rows(month, 1)
+            fresh = [r for r in values[1:] if any(r)]
+            self.loaded_at[month] = time.time()
+            if fresh == rows:
+                return
+            self.rows[month] = fresh
+            logger.info(f"📥 {month}: {len(fresh)}行を読み込み")
+        else:
+            # 前回読んだ行の次からだけ取得する（ヘッダーの分 +1）
+            appended = [r for r in self.source.fetch_rows(month, len(rows) + 2) if any(r)]
+            if not appended:
+                return
+            rows.extend(appended)
+            logger.info(f"📥 {month}: 追記 {len(appended)}行")
+        self.frames.pop(month, None)
+        self.version += 1
+
+    def frame(self, months: List[str]) -> pd.DataFrame:
+        """選ばれた月をまとめた型付き DataFrame（月ごとの変換結果は使い回す）"""
+        with self.lock:
+            parts = []
+            for month in months:
+                if month not in self.rows:
+                    continue
+                if month not in self.frames:
+                    self.frames[month] = to_typed_frame(self.rows[month], month)
+                parts.append(self.frames[month])
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts, ignore_index=True)
+        # 月ごとにカテゴリの中身が違うと object に戻るので付け直す
+        for column in CATEGORY_COLUMNS + ('月',):
+            df[column] = df[column].astype('category')
+        return df
+
+
+# --- 絞り込みと集計（サーバー側で済ませ、画面には絞り込んだ行と小さな集計表だけを送る） ---
+def filter_projects(df: pd.DataFrame, prefectures=(), labels=(), deadline_from=None, deadline_to=None,
+                    open_only: bool = False, today=None) -> pd.DataFrame:
+    """条件をまとめた1つの真偽マスクで絞り込む（締切不明の案件は「募集中」として扱う）"""
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if prefectures:
+        mask &= df['都道府県/市区町村'].isin(prefectures)
+    if labels:
+        mask &= df['ラベル'].isin(labels)
+    deadline = df['締切']
+    if deadline_from is not None:
+        mask &= deadline >= pd.Timestamp(deadline_from)
+    if deadline_to is not None:
+        mask &= deadline <= pd.Timestamp(deadline_to)
+    if open_only:
+        mask &= deadline.isna() | (deadline >= pd.Timestamp(today or datetime.now().date()))
+    return df[mask]
+
+
+def aggregate(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """都道府県別・ラベル別・締切週×ラベル別の件数"""
+    if df.empty:
+        empty = pd.DataFrame(columns=['件数'])
+        return {'prefecture': empty, 'label': empty, 'deadline_week': empty}
+    by_prefecture = (df.groupby('都道府県/市区町村', observed=True).size()
+                     .sort_values(ascending=False).rename('件数').reset_index())
+    by_label = df.groupby('ラベル', observed=True).size().rename('件数').reset_index()
+    week = df['締切'].dt.to_period('W-SUN').dt.start_time.rename('締切週')
+    by_week = (df.groupby([week, df['ラベル']], observed=True).size()
+               .rename('件数').reset_index().sort_values('締切週'))
+    # 集計表は小さいので、描画側で扱いやすいよう分類の列はふつうの文字列に戻す
+    for table, column in ((by_prefecture, '都道府県/市区町村'), (by_label, 'ラベル'), (by_week, 'ラベル')):
+        table[column] = table[column].astype(str)
+    return {'prefecture': by_prefecture, 'label': by_label, 'deadline_week': by_week}
@@ -0,0 +1,129 @@
+"""案件ストア（採用した案件の正本。スプレッドシートはここからの書き出し先）
+
+月ごと・都道府県・締切・ラベルで索引を張った SQLite に、実行のたびに upsert する。
+履歴の検索・重複確認・ダッシュボードはスプレッドシートではなくこちらを読む。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+# 検索しやすいよう列に出しておく項目（残りは data 列のJSONにそのまま持つ）
+COLUMNS = ('label', 'prefecture', 'title', 'method', 'budget', 'period',
+           'deadline_apply', 'deadline_ques', 'deadline_prop', 'source_url', 'evidence', 'memo')
+
+_DATE = re.compile(r'(\d{4})[-/年](\d{1,2})[-/月](\d{1,2})')
+
+
+def project_id(url: Optional[str]) -> str:
+    """公告URLから作る案件ID（同じ案件は実行をまたいでも同じID）"""
+    return hashlib.sha256((url or '').strip().encode('utf-8')).hexdigest()[:12]
+
+
+def parse_deadline(project: Dict) -> Optional[str]:
+    """参加申込・提案書の締切のうち遅い方を YYYY-MM-DD で返す（読めなければ None）"""
+    dates = []
+    for key in ('deadline_apply', 'deadline_prop'):
+        m = _DATE.search(project.get(key) or '')
+        if m:
+            try:
+                dates.append(date(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+            except ValueError:
+                continue
+    return max(dates).isoformat() if dates else None
+
+
+class ProjectStore:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS projects (
+                id TEXT PRIMARY KEY,
+                month TEXT,
+                {', '.join(f'{c} TEXT' for c in COLUMNS)},
+                deadline TEXT,
+                data TEXT,
+                first_seen REAL,
+                last_seen REAL,
+                seq INTEGER
+            )""")
+        for column in ('month', 'prefecture', 'deadline', 'label', 'seq'):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS projects_{column} ON projects ({column})")
+        self.conn.commit()
+
+    def upsert(self, projects: Iterable[Dict], month: str) -> Dict[str, int]:
+        """案件IDで突き合わせて追加・更新する（初めて見た月は month のまま変えない）
+
+        内容が変わった行だけ seq を進める（差分読み込みの目印）。
+        """
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+        now = time.time()
+        with self.lock:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM projects").fetchone()[0]
+            for p in projects:
+                pid = project_id(p.get('source_url'))
+                data = json.dumps(p, ensure_ascii=False, sort_keys=True)
+                row = self.conn.execute("SELECT data FROM projects WHERE id = ?", (pid,)).fetchone()
+                if row and row['data'] == data:
+                    self.conn.execute("UPDATE projects SET last_seen = ? WHERE id = ?", (now, pid))
+                    stats['unchanged'] += 1
+                    continue
+                seq += 1
+                values = [str(p[c]) if p.get(c) is not None else None for c in COLUMNS]
+                if row:
+                    self.conn.execute(
+                        f"UPDATE projects SET {', '.join(f'{c} = ?' for c in COLUMNS)}, "
+                        "deadline = ?, data = ?, last_seen = ?, seq = ? WHERE id = ?",
+                        (*values, parse_deadline(p), data, now, seq, pid))
+                    stats['updated'] += 1
+                else:
+                    self.conn.execute(
+                        f"INSERT INTO projects (id, month, {', '.join(COLUMNS)}, deadline, data, "
+                        f"first_seen, last_seen, seq) VALUES ({', '.join('?' * (len(COLUMNS) + 7))})",
+                        (pid, month, *values, parse_deadline(p), data, now, now, seq))
+                    stats['added'] += 1
+            self.conn.commit()
+        return stats
+
+    def query(self, month: Optional[str] = None, prefecture: Optional[str] = None,
+              label: Optional[str] = None, deadline_from: Optional[str] = None,
+              deadline_to: Optional[str] = None) -> List[Dict]:
+        """条件に合う案件を、初めて見た順に返す（締切は YYYY-MM-DD の文字列で比べる）"""
+        where, params = [], []
+        for column, value in (('month', month), ('prefecture', prefecture), ('label', label)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if deadline_from is not None:
+            where.append("deadline >= ?")
+            params.append(deadline_from)
+        if deadline_to is not None:
+            where.append("deadline <= ?")
+            params.append(deadline_to)
+        sql = "SELECT data FROM projects"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self.lock:
+            rows = self.conn.execute(sql + " ORDER BY first_seen, rowid", params).fetchall()
+        return [json.loads(r['data']) for r in rows]
+
+    def months(self) -> List[str]:
+        with self.lock:
+            return [r[0] for r in self.conn.execute("SELECT DISTINCT month FROM projects ORDER BY month")]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,62 @@
+"""既読ストア（URL・本文ハッシュ・前回のAI解析結果を実行間で保持）"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SeenStore:
+    """前回までに処理したリンクを記録し、差分実行（--incremental）の判定に使う"""
+
+    def __init__(self, path: str, recheck_days: float = 0):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.recheck_seconds = recheck_days * 86400
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                content_hash TEXT,
+                analysis TEXT,
+                checked_at REAL
+            )""")
+        self.conn.commit()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT title, content_hash, analysis, checked_at FROM seen WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        title, content_hash, analysis, checked_at = row
+        return {
+            'title': title,
+            'content_hash': content_hash,
+            'analysis': json.loads(analysis) if analysis else None,
+            'checked_at': checked_at,
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """再取得せずに前回結果を信用してよい期間内か（recheck_days が 0 なら常に再取得する）"""
+        return self.recheck_seconds > 0 and time.time() - entry['checked_at'] < self.recheck_seconds
+
+    def record(self, url: str, title: str, content_hash: str, analysis: Optional[Dict]):
+        """本文ハッシュと解析結果（門番で落ちた場合は None）を保存"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?, ?)",
+                (url, title, content_hash,
+                 json.dumps(analysis, ensure_ascii=False) if analysis is not None else None,
+                 time.time()),
+            )
+            self.conn.commit()
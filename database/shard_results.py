@@ -0,0 +1,58 @@
+"""分担巡回（--shard k/N）の中間ファイル
+
+各分担は採用した案件を「全体での定義順の番号」付きで JSON に書き出すだけにして、
+スプレッドシートへの書き込みは最後の合流（--merge）で1回だけ行う（書き込みの衝突を避けるため）。
+"""
+
+import glob
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def shard_path(directory: str, shard: Tuple[int, int]) -> str:
+    k, n = shard
+    return os.path.join(directory, f"shard-{k:03d}-of-{n:03d}.json")
+
+
+def write_shard_results(directory: str, shard: Tuple[int, int], ordered_results: List[Tuple],
+                        extra: Optional[Dict] = None) -> str:
+    """(定義順の番号, 案件) の組を分担ごとのファイルに書き出す"""
+    path = shard_path(directory, shard)
+    payload = {
+        'shard': list(shard),
+        **(extra or {}),
+        'results': [{'order': list(order), 'project': project} for order, project in ordered_results],
+    }
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    logger.info(f"🧩 分担 {shard[0]}/{shard[1]}: 案件 {len(ordered_results)}件 → {path}")
+    return path
+
+
+def load_shard_results(directory: str) -> Tuple[List[Tuple], List[int], int]:
+    """全分担のファイルを読み、(定義順に並べた (番号, 案件) の組, 欠けている分担, 分割数) を返す"""
+    total = None
+    found = set()
+    ordered = []
+    for path in sorted(glob.glob(os.path.join(directory, 'shard-*-of-*.json'))):
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        k, n = payload['shard']
+        if total is None:
+            total = n
+        elif n != total:
+            raise ValueError(f"分割数の違う中間ファイルが混ざっています: {path}（{n}分割 / 他は{total}分割）")
+        found.add(k)
+        ordered.extend((tuple(r['order']), r['project']) for r in payload['results'])
+    if total is None:
+        return [], [], 0
+    ordered.sort(key=lambda x: x[0])
+    missing = [k for k in range(1, total + 1) if k not in found]
+    return ordered, missing, total
@@ -1,17 +1,26 @@
 import gspread
 from google.oauth2.service_account import Credentials
 import logging
+import random
+import time
+
+from config import settings
+from database.project_store import project_id
 
 logger = logging.getLogger(__name__)
 
+# 割り当て超過・一時的な障害として待ってから再試行する応答
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
 class SheetsManager:
     # 指示書 v1.2 準拠の16項目
     HEADER = [
-        "案件ID", "ラベル", "発注主体", "都道府県/市区町村", "件名", 
-        "方式", "予算上限/予定価格", "履行期間", 
-        "締切(参加申込)", "締切(質問)", "締切(提案書)", 
+        "案件ID", "ラベル", "発注主体", "都道府県/市区町村", "件名",
+        "方式", "予算上限/予定価格", "履行期間",
+        "締切(参加申込)", "締切(質問)", "締切(提案書)",
         "公告URL", "添付資料URL", "映像要件の根拠(Evidence)", "タグ", "メモ"
     ]
+    URL_COLUMN = HEADER.index("公告URL")
 
     def __init__(self, spreadsheet_id, credentials_dict):
         scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
@@ -19,48 +28,123 @@ class SheetsManager:
         self.client = gspread.authorize(creds)
         self.spreadsheet = self.client.open_by_key(spreadsheet_id)
 
-    def prepare_v12_sheet(self, sheet_name):
-        """指示書v1.2用の新しいシートを準備（既存があればリセット）"""
+    project_id = staticmethod(project_id)
+
+    def open_month_sheet(self, sheet_name):
+        """月ごとのシートを開く（無ければヘッダー付きで作る。既存の行は消さない）"""
         try:
+            return self._with_backoff(self.spreadsheet.worksheet, sheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            pass
+        ws = self._with_backoff(self.spreadsheet.add_worksheet, title=sheet_name, rows="1000", cols="20")
+        self._with_backoff(ws.batch_update, [
+            {'range': 'A1:P1', 'values': [self.HEADER]},
+        ])
+        self._with_backoff(ws.format, 'A1:P1', {'textFormat': {'bold': True},
+                                                'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}})
+        return ws
+
+    def project_row(self, p):
+        row = [
+            self.project_id(p.get('source_url')),
+            p.get('label'),
+            p.get('prefecture', '不明'),
+            p.get('prefecture', '不明'),
+            p.get('title'),
+            p.get('method', '公募型プロポーザル'),
+            p.get('budget', '資料参照'),
+            p.get('period', '資料参照'),
+            p.get('deadline_apply', '不明'),  # 🆕 締切(参加申込)
+            p.get('deadline_ques', '不明'),
+            p.get('deadline_prop', '不明'),
+            p.get('source_url'),
+            # ほぼ同じ公告（PDF告知・転載ページ等）があれば、そのURLも並べる
+            "\n".join(p.get('duplicate_urls') or [p.get('source_url') or '']),
+            p.get('evidence'),
+            "映像制作",
+            p.get('memo')
+        ]
+        # シートから読み戻した値（文字列）とそのまま比べられるようにそろえる
+        return ['' if v is None else str(v) for v in row]
+
+    def upsert_projects(self, worksheet, projects):
+        """案件IDで既存の行と突き合わせ、新しい行と内容の変わった行だけを書き込む
+
+        既存の行は1回の読み込みでまとめて取得し、書き込みは batch_update を行数で区切って送る。
+        """
+        existing = self._with_backoff(worksheet.get_all_values)
+        row_of = {}
+        for i, values in enumerate(existing[1:], start=2):
+            values = values + [''] * (len(self.HEADER) - len(values))
+            # 連番IDだった頃の行は公告URLから案件IDを作り直して照合する
+            key = values[0] if values[0] and not values[0].isdigit() else self.project_id(values[self.URL_COLUMN])
+            row_of.setdefault(key, (i, values[:len(self.HEADER)]))
+
+        updates = []
+        new_rows = []
+        seen = set()
+        for p in projects:
+            row = self.project_row(p)
+            if row[0] in seen:
+                continue
+            seen.add(row[0])
+            if row[0] not in row_of:
+                new_rows.append(row)
+            elif row_of[row[0]][1] != row:
+                updates.append((row_of[row[0]][0], row))
+
+        stats = {'added': len(new_rows), 'updated': len(updates),
+                 'unchanged': len(seen) - len(new_rows) - len(updates)}
+
+        next_row = max(len(existing), 1) + 1
+        if new_rows and next_row + len(new_rows) - 1 > worksheet.row_count:
+            self._with_backoff(worksheet.add_rows, next_row + len(new_rows) - 1 - worksheet.row_count)
+        updates.extend((next_row + i, row) for i, row in enumerate(new_rows))
+        if not existing:
+            # ヘッダーまで消されていた空のシート
+            updates.append((1, list(self.HEADER)))
+
+        # 連続する行は1つの範囲にまとめ、行数で区切って送る
+        updates.sort(key=lambda x: x[0])
+        chunk, chunk_rows = [], 0
+        for start, rows in self._contiguous(updates):
+            for offset in range(0, len(rows), settings.SHEETS_WRITE_CHUNK_ROWS):
+                part = rows[offset:offset + settings.SHEETS_WRITE_CHUNK_ROWS]
+                if chunk_rows + len(part) > settings.SHEETS_WRITE_CHUNK_ROWS:
+                    self._with_backoff(worksheet.batch_update, chunk)
+                    chunk, chunk_rows = [], 0
+                row = start + offset
+                chunk.append({'range': f"A{row}:P{row + len(part) - 1}", 'values': part})
+                chunk_rows += len(part)
+        if chunk:
+            self._with_backoff(worksheet.batch_update, chunk)
+
+        logger.info(f"📝 シート更新: 追加 {stats['added']}件 / 変更 {stats['updated']}件 / 変化なし {stats['unchanged']}件")
+        return stats
+
+    @staticmethod
+    def _contiguous(updates):
+        """(行番号, 行) の並びを、連続する行ごとの (先頭行番号, [行...]) にまとめる"""
+        start, rows = None, []
+        for row_number, row in updates:
+            if rows and row_number == start + len(rows):
+                rows.append(row)
+                continue
+            if rows:
+                yield start, rows
+            start, rows = row_number, [row]
+        if rows:
+            yield start, rows
+
+    @staticmethod
+    def _with_backoff(func, *args, **kwargs):
+        """割り当て超過(429)・5xx は間隔を倍々に空けて再試行する"""
+        for attempt in range(settings.SHEETS_MAX_RETRIES + 1):
             try:
-                ws = self.spreadsheet.worksheet(sheet_name)
-                self.spreadsheet.del_worksheet(ws)
-            except gspread.exceptions.WorksheetNotFound:
-                pass
-            
-            ws = self.spreadsheet.add_worksheet(title=sheet_name, rows="1000", cols="20")
-            ws.append_row(self.HEADER)
-            ws.format('A1:P1', {'textFormat': {'bold': True}, 'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}})
-            return ws
-        except Exception as e:
-            logger.error(f"シート準備エラー: {e}")
-            return None
-
-    def append_projects(self, worksheet, projects):
-        """A/Bラベルの案件をスプレッドシートに一括追加"""
-        rows_to_add = []
-        for i, p in enumerate(projects, 1):
-            row = [
-                i, 
-                p.get('label'), 
-                p.get('prefecture', '不明'), 
-                p.get('prefecture', '不明'), 
-                p.get('title'),
-                p.get('method', '公募型プロポーザル'), 
-                p.get('budget', '資料参照'), 
-                p.get('period', '資料参照'),
-                p.get('deadline_apply', '不明'),  # 🆕 締切(参加申込)
-                p.get('deadline_ques', '不明'), 
-                p.get('deadline_prop', '不明'),
-                p.get('source_url'), 
-                p.get('source_url'), 
-                p.get('evidence'), 
-                "映像制作", 
-                p.get('memo')
-            ]
-            rows_to_add.append(row)
-        
-        if rows_to_add:
-            worksheet.append_rows(rows_to_add)
-            return len(rows_to_add)
-        return 0
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if e.code not in RETRY_STATUSES or attempt == settings.SHEETS_MAX_RETRIES:
+                    raise
+                wait = min(64, 2 ** attempt) + random.random()
+                logger.warning(f"⏳ Sheets API {e.code}: {wait:.1f}秒待って再試行します")
+                time.sleep(wait)
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import os
 import json
@@ -7,45 +8,45 @@ import unicodedata
 from datetime import datetime, timezone, timedelta
 from concurrent.futures import ThreadPoolExecutor # 🆕 並列処理の司令塔
 from analyzer.ai_analyzer import AIAnalyzer
+from analyzer.batch_analyzer import BatchAnalyzer
+from analyzer.result_cache import AnalysisCache
 from database.sheets_manager import SheetsManager
+from database.project_store import ProjectStore, project_id
+from database.seen_store import SeenStore
+from database.checkpoint import CheckpointLog
+from database.shard_results import load_shard_results, write_shard_results
+from config import settings
+from config.municipalities import parse_shard
+from utils.host_health import get_host_health
+from utils.http_client import pool_stats
+from utils.keyword_gate import TASK_GATE
+from utils.metrics import METRICS
+from utils.near_duplicate import create_near_duplicate_index, finalize_duplicate_urls
+from utils.pipeline import Pipeline, Stage
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# --- 🆕 作業員（1件の案件を徹底的に調べる関数） ---
-def process_task(task, extractor, analyzer, today):
-    url = task['url']
-    title_raw = task['title']
-    pref = task['pref']
+def reject(gate):
+    """門番ごとの除外数を数えて False を返す"""
+    METRICS.count('gate_rejected', gate)
+    return False
 
+# --- 🛡️ 門番（AIに送る前のタイトル選別） ---
+def passes_title_gate(url, title_raw):
     # 🛡️ 門番1：SNS除外 ＆ タイトルの「冷徹な排除」
-    if re.search(r"youtube\.com|youtu\.be|facebook\.com|instagram\.com|x\.com|twitter\.com", url): return None
-    if re.search(r"決定|公表|選定|落札|結果|審査|報告|実績|成功|達成|公開|完了|制作しました|放映中|配信中|終了", title_raw):
-        return None
-    if re.search(r"採用|職員|薬剤師|警察|教員|看護|医師|試験|相談|個人|講習", title_raw):
-        return None
+    if TASK_GATE.has(url, "sns"): return reject("sns")
+    if TASK_GATE.has(title_raw, "closed"): return reject("title")
+    if TASK_GATE.has(title_raw, "recruitment"): return reject("title")
 
     # 🛡️ 門番2：クリエイティブ案件キーワード（これがないとAIに送らない）
-    if not re.search(r"募集|委託|入札|プロポーザル|コンペ|公募|企画提案|制作|作成|撮影|業務|動画|PR|プロモーション", title_raw):
-        return None
+    if not TASK_GATE.has(title_raw, "creative"): return reject("creative")
+    return True
 
-    # ページ内容の取得
-    content_data = extractor.extract(url)
-    if not content_data: return None
-    
-    # 全角半角の正規化
-    normalized_text = unicodedata.normalize('NFKC', content_data['content'])
-
-    # 🛡️ 門番3：年度検閲（令和8年度を救済）
-    if not re.search(r"令和[789]|R[789]|202[567]", normalized_text):
-        return None
-
-    # AI解析 (Haiku 4.5)
-    analysis = analyzer.analyze_single(title_raw, normalized_text, url)
-    if not analysis: return None
-    
+# --- 🛡️ 門番（AI回答の最終精査。前回結果の再利用時も毎回かけ直す） ---
+def passes_final_gate(analysis, title_raw, today):
     # 🛡️ 門番4：AI回答の最終精査
-    if analysis.get('label') not in ["A", "B"]: return None
+    if analysis.get('label') not in ["A", "B"]: return reject("label")
     
     # ① 期限切れチェック (ゾンビ案件を数学的に除外)
     dates_to_check = []
@@ -57,67 +58,464 @@ def process_task(task, extractor, analyzer, today):
     
     if dates_to_check and all(d < today for d in dates_to_check):
         # logger.info(f"⌛ 期限切れ除外: {title_raw}") # 並列時はログが混ざるので抑制
-        return None
+        return reject("deadline")
 
     # ② 令和8年度(2026)の案件であることを最終確認
     evidence = analysis.get('evidence','')
     memo = analysis.get('memo','')
     full_ans = f"{title_raw} {evidence} {memo}"
     if re.search(r"令和7年度?の案件|令和7年度予算のみ", memo) and "令和8" not in full_ans:
-        return None
+        return reject("year")
+    return True
+
+# --- 🆕 前処理（AIに送る直前まで：門番1〜3と本文取得） ---
+def prepare_task(task, extractor, seen_store=None, checkpoint=None):
+    """AI解析が必要なら {'text', 'hash'} を、前回結果を再利用できるなら {'analysis'} を返す"""
+    if not passes_title_gate(task['url'], task['title']): return None
+    return fetch_task(task, extractor, seen_store, checkpoint)
+
+def fetch_task(task, extractor, seen_store=None, checkpoint=None):
+    """タイトル門番を通過済みのリンクについて、本文取得と年度検閲を行う"""
+    url = task['url']
+    title_raw = task['title']
+
+    # ⏯️ 再開：中断した実行で取得済みのリンクは記録から戻す
+    if checkpoint and checkpoint.has_extract(url):
+        METRICS.count('resumed', 'extract')
+        prepared = checkpoint.get_extract(url)
+        return {'task': task, **prepared} if prepared else None
+
+    # ♻️ 差分実行：INCREMENTAL_RECHECK_DAYS を指定したときだけ、最近確認したばかりのリンクは取得も省略する
+    # （既定は毎回取得し、本文ハッシュが前回と同じときだけAIを省略する）
+    prev = seen_store.get(url) if seen_store else None
+    if prev and prev['title'] == title_raw and seen_store.is_fresh(prev):
+        METRICS.count('incremental', 'fresh')
+        return {'task': task, 'analysis': prev['analysis']} if prev['analysis'] else None
+
+    # ページ内容の取得
+    with METRICS.timer('extract'):
+        content_data = extractor.extract(url)
+    if not content_data: return None
+    
+    # 全角半角の正規化
+    normalized_text = unicodedata.normalize('NFKC', content_data['content'])
+    content_hash = SeenStore.content_hash(normalized_text)
+
+    if prev and prev['content_hash'] == content_hash:
+        # ♻️ 本文が前回と同一 → AIには送らない
+        seen_store.record(url, title_raw, content_hash, prev['analysis'])
+        METRICS.count('incremental', 'unchanged')
+        prepared = {'analysis': prev['analysis']} if prev['analysis'] else None
+    elif not TASK_GATE.has(normalized_text, "fiscal_year"):
+        # 🛡️ 門番3：年度検閲（令和8年度を救済）
+        if seen_store: seen_store.record(url, title_raw, content_hash, None)
+        reject("year")
+        prepared = None
+    else:
+        prepared = {'analysis': None, 'text': normalized_text, 'hash': content_hash}
+
+    if checkpoint: checkpoint.record_extract(url, prepared)
+    return {'task': task, **prepared} if prepared else None
+
+# --- 🆕 後処理（AI回答を受け取ってからの最終判定） ---
+def finalize_task(prepared, analysis, today, seen_store=None):
+    task = prepared['task']
+    if not analysis: return None
+    if seen_store and prepared.get('hash'):
+        seen_store.record(task['url'], task['title'], prepared['hash'], analysis)
+    if not passes_final_gate(analysis, task['title'], today): return None
 
     # すべての関門を突破！
-    analysis.update({'prefecture': pref})
+    analysis = dict(analysis)
+    analysis.update({'prefecture': task['pref']})
     return analysis
 
+# --- 🆕 AI解析段（前処理済みの1件を解析して最終判定まで） ---
+def analyze_task(prepared, analyzer, today, seen_store=None, checkpoint=None, near_dups=None):
+    analysis = prepared['analysis']
+    cluster = None
+    if analysis is None:
+        task = prepared['task']
+        analysis = checkpoint.get_analysis(task['url']) if checkpoint else None
+        if analysis is not None:
+            METRICS.count('resumed', 'analysis')
+        else:
+            # 🔁 ほぼ同じ公告が先に解析中・解析済みなら、その結果を待ってリーダーの案件にまとめる
+            cluster, leader = near_dups.claim(prepared['text'], task['url']) if near_dups else (None, True)
+            if not leader:
+                analysis, leader = cluster.follow(settings.NEAR_DUP_WAIT_SECONDS)
+                if analysis is not None:
+                    merge_follower(prepared, analysis, seen_store, checkpoint)
+                    return None
+            if analysis is None:
+                try:
+                    analysis = analyzer.analyze_single(task['title'], prepared['text'], task['url'])
+                finally:
+                    if leader and cluster: cluster.resolve(analysis)
+            if checkpoint and analysis: checkpoint.record_analysis(task['url'], analysis)
+    return attach_cluster(finalize_task(prepared, analysis, today, seen_store), cluster)
+
+def merge_follower(prepared, analysis, seen_store=None, checkpoint=None):
+    """フォロワーは自分の行を作らない（URLはリーダーの案件の duplicate_urls に載る）。差分実行・再開用に結果だけ残す"""
+    task = prepared['task']
+    if checkpoint: checkpoint.record_analysis(task['url'], analysis)
+    if seen_store and prepared.get('hash'):
+        seen_store.record(task['url'], task['title'], prepared['hash'], analysis)
+
+def attach_cluster(result, cluster):
+    """塊に集まったURL（実行の最後に finalize_duplicate_urls で確定する）を案件に付ける"""
+    if result and cluster:
+        result['duplicate_urls'] = cluster.urls
+    return result
+
+# --- 🆕 作業員（1件の案件を徹底的に調べる関数） ---
+def process_task(task, extractor, analyzer, today, seen_store=None, checkpoint=None, near_dups=None):
+    prepared = prepare_task(task, extractor, seen_store, checkpoint)
+    if not prepared: return None
+    return analyze_task(prepared, analyzer, today, seen_store, checkpoint, near_dups)
+
+# --- ⏯️ 巡回（再開時は巡回済みの自治体を記録から戻し、残りだけを巡回する） ---
+def crawl_municipalities(shard=None, checkpoint=None):
+    from scrapers.direct_scraper import iter_prefectures_direct
+    done = dict(checkpoint.crawled) if checkpoint else {}
+    for order, entry in sorted(done.items()):
+        METRICS.count('resumed', 'crawl')
+        yield order, entry['pref'], entry['results']
+    for order, pref, results in iter_prefectures_direct(shard=shard, skip=set(done)):
+        if checkpoint: checkpoint.record_crawl(order, pref, results)
+        yield order, pref, results
+
+# --- 🆕 流れ作業モード（巡回しながら選別・取得・解析を同時進行） ---
+def run_streaming_mode(extractor, analyzer, today, seen_store=None, extract_workers=None, shard=None,
+                       checkpoint=None, near_dups=None):
+    """巡回 → タイトル門番 → 本文取得 → AI解析 を有界キューでつなぎ、各段を同時に動かす
+
+    (巡回定義順の番号, 案件) の組を定義順に並べて返す。
+    """
+    def analyze(prepared):
+        result = analyze_task(prepared, analyzer, today, seen_store, checkpoint, near_dups)
+        return (prepared['task']['order'], result) if result else None
+
+    def crawled_tasks():
+        for order, pref, results in crawl_municipalities(shard, checkpoint):
+            for i, r in enumerate(results):
+                yield {"pref": pref, "order": (order, i), **r}
+
+    pipeline = Pipeline([
+        Stage("タイトル門番", lambda t: t if passes_title_gate(t['url'], t['title']) else None,
+              workers=1, queue_size=settings.PIPELINE_QUEUE_SIZE),
+        Stage("本文取得", lambda t: fetch_task(t, extractor, seen_store, checkpoint),
+              workers=extract_workers or settings.PIPELINE_EXTRACT_WORKERS, queue_size=settings.PIPELINE_QUEUE_SIZE),
+        Stage("AI解析", analyze,
+              workers=settings.PIPELINE_ANALYZE_WORKERS, queue_size=settings.PIPELINE_QUEUE_SIZE),
+    ])
+    # 書き込み段：到着順に集めておき、最後に巡回定義順へ並べ直す（重複排除の優先順位を従来通りにするため）
+    results = list(pipeline.run(crawled_tasks()))
+    logger.info(f"📊 {pipeline.summary()}")
+    return sorted(results, key=lambda x: x[0])
+
+# --- 🆕 一括モード（Message Batches API でまとめて解析） ---
+def run_batch_mode(all_tasks, extractor, batch_analyzer, today, seen_store=None, extract_workers=None,
+                   checkpoint=None, near_dups=None):
+    """本文取得だけ並列で行い、AI解析は1つのバッチジョブとして投げる（結果は巡回定義順の (番号, 案件) の組）"""
+    with ThreadPoolExecutor(max_workers=extract_workers or 10) as executor:
+        prepared_list = [p for p in executor.map(lambda t: prepare_task(t, extractor, seen_store, checkpoint),
+                                                 all_tasks) if p]
+
+    results = []
+    pending = {}
+    clusters = {}   # リーダーの custom_id → 塊
+    leaders = {}    # id(塊) → リーダーの custom_id
+    followers = []  # (リーダーの custom_id, 自分の custom_id, 前処理済みの1件, 塊)
+    for i, prepared in enumerate(prepared_list):
+        analysis = prepared['analysis']
+        if analysis is None and checkpoint:
+            analysis = checkpoint.get_analysis(prepared['task']['url'])
+        if analysis is not None:
+            results.append((prepared['task']['order'], finalize_task(prepared, analysis, today, seen_store)))
+            continue
+        # 🔁 ほぼ同じ公告は塊の最初の1件だけをバッチに入れる
+        cluster, leader = near_dups.claim(prepared['text'], prepared['task']['url']) if near_dups else (None, True)
+        if leader:
+            pending[f"task-{i}"] = prepared
+            if cluster:
+                clusters[f"task-{i}"] = cluster
+                leaders[id(cluster)] = f"task-{i}"
+        else:
+            followers.append((leaders[id(cluster)], f"task-{i}", prepared, cluster))
+
+    logger.info(f"📦 バッチ投入: {len(pending)}件（再利用 {len(prepared_list) - len(pending) - len(followers)}件 / "
+                f"ほぼ同じ公告 {len(followers)}件）")
+
+    def submit(batch):
+        """(custom_id, 解析結果) を返しつつ、解析できたものは途中記録に残す"""
+        items = [{'custom_id': cid, 'title': p['task']['title'], 'content': p['text'], 'url': p['task']['url']}
+                 for cid, p in batch.items()]
+        for custom_id, analysis in batch_analyzer.analyze_many(items):
+            if checkpoint and analysis: checkpoint.record_analysis(batch[custom_id]['task']['url'], analysis)
+            yield custom_id, analysis
+
+    analyses = {}
+    for custom_id, analysis in submit(pending):
+        analyses[custom_id] = analysis
+        prepared = pending[custom_id]
+        results.append((prepared['task']['order'],
+                        attach_cluster(finalize_task(prepared, analysis, today, seen_store), clusters.get(custom_id))))
+    # フォロワーはリーダーの案件にまとめる。リーダーが解析に失敗した塊は、流れ作業モードと同じく
+    # 残りのフォロワーの1件を新しいリーダーにしてもう1回バッチに入れる（塊の案件は1行のまま）
+    waiting = {}  # リーダーの custom_id → [(自分の custom_id, 前処理済みの1件, 塊), ...]
+    for leader_id, custom_id, prepared, cluster in followers:
+        waiting.setdefault(leader_id, []).append((custom_id, prepared, cluster))
+    while waiting:
+        retry = {}
+        for leader_id, members in waiting.items():
+            if analyses.get(leader_id) is not None:
+                for _, prepared, _ in members:
+                    merge_follower(prepared, analyses[leader_id], seen_store, checkpoint)
+            else:
+                retry[members[0][0]] = members
+        if not retry:
+            break
+        logger.info(f"📦 リーダーの解析に失敗した塊を再投入: {len(retry)}件")
+        for custom_id, analysis in submit({cid: members[0][1] for cid, members in retry.items()}):
+            analyses[custom_id] = analysis
+            _, prepared, cluster = retry[custom_id][0]
+            results.append((prepared['task']['order'],
+                            attach_cluster(finalize_task(prepared, analysis, today, seen_store), cluster)))
+        waiting = {cid: members[1:] for cid, members in retry.items() if members[1:]}
+    return sorted((r for r in results if r[1]), key=lambda x: x[0])
+
+# --- 📈 実行メトリクスの書き出し ---
+def write_run_metrics(extra):
+    try:
+        summary = METRICS.write_json(settings.METRICS_JSON_PATH, extra)
+        stages = summary['stages']
+        logger.info("📈 所要時間(累計): " + " / ".join(f"{k} {v['seconds']:.1f}秒" for k, v in stages.items()))
+        logger.info(f"📈 門番の除外数: {summary['counters'].get('gate_rejected', {})} / "
+                    f"受信 {summary['bytes_downloaded'] / 1e6:.1f}MB → {settings.METRICS_JSON_PATH}")
+        if settings.METRICS_PROMETHEUS_PATH:
+            METRICS.write_prometheus(settings.METRICS_PROMETHEUS_PATH)
+    except Exception as e:
+        logger.warning(f"メトリクスの書き出しに失敗: {e}")
+
+# --- 📝 スプレッドシートへの書き込み（1回の実行につき1回） ---
+def dedupe_by_title(ordered_results):
+    """定義順に並んだ (番号, 案件) から、同じ件名の2件目以降を除く"""
+    seen_titles = set()
+    unique = []
+    for order, result in ordered_results:
+        title = result.get('title', '無題')
+        if title not in seen_titles:
+            seen_titles.add(title)
+            unique.append((order, result))
+    return unique
+
+def create_sheets_manager():
+    return SheetsManager(os.environ["SPREADSHEET_ID"], json.loads(os.environ["GCP_SERVICE_ACCOUNT"]))
+
+def write_projects(sheets_manager, final_projects, jst):
+    """案件ストア（正本）に書いてから、今月分をシートへ書き出す
+
+    今月のシートには、今月初めて見た案件に加えて、この実行で採用した案件（先月から募集が続いているもの）も載せる。
+    """
+    if not final_projects:
+        logger.warning("⚠️ 現在募集中の有効案件は見つかりませんでした")
+        return
+    now = datetime.now(jst)
+    month = now.strftime("%Y-%m")
+    store = ProjectStore(settings.PROJECT_STORE_PATH)
+    try:
+        with METRICS.timer('project_store'):
+            stats = store.upsert(final_projects, month)
+        logger.info(f"✨ 完了！ 真の有効案件 {len(final_projects)}件（新規 {stats['added']}件 / 更新 {stats['updated']}件）"
+                    f" → {settings.PROJECT_STORE_PATH}（累計 {store.count()}件）")
+        # ストアの month は初めて見た月のままなので、この実行の採用案件を足す（同じ案件は1行に）
+        month_projects = list({project_id(p.get('source_url')): p
+                               for p in store.query(month=month) + final_projects}.values())
+    finally:
+        store.close()
+    sheet_name = now.strftime("映像案件_%Y年%m月_v16")
+    with METRICS.timer('sheets'):
+        sheets_manager.upsert_projects(sheets_manager.open_month_sheet(sheet_name), month_projects)
+
+# --- 🧩 分担巡回の合流（全分担の中間ファイルをまとめて1回だけ書き込む） ---
+def run_merge(shard_dir):
+    ordered, missing, total = load_shard_results(shard_dir)
+    if not total:
+        logger.error(f"❌ 中間ファイルが見つかりません: {shard_dir}")
+        return None
+    if missing:
+        logger.warning(f"⚠️ {total}分割のうち分担 {missing} の中間ファイルがありません（届いた分だけで合流します）")
+    unique = dedupe_by_title(ordered)
+    logger.info(f"🧩 合流: {total}分割 / 案件 {len(ordered)}件 → 重複除外後 {len(unique)}件")
+    write_projects(create_sheets_manager(), [result for _, result in unique], timezone(timedelta(hours=9)))
+    return len(unique)
+
+# --- ⏯️ 途中経過の記録先（分担ごとに別ファイル） ---
+def checkpoint_path(shard=None):
+    name = f"checkpoint-shard-{shard[0]:03d}-of-{shard[1]:03d}.jsonl" if shard else "checkpoint.jsonl"
+    return os.path.join(settings.CACHE_DIR, name)
+
 # --- メインエンジン ---
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="映像案件スクレイピング")
+    parser.add_argument('--incremental', action='store_true',
+                        help="前回から本文が変わっていないリンクはAI解析を省略する")
+    parser.add_argument('--batch', action='store_true',
+                        help="AI解析を Message Batches API でまとめて実行する（結果待ちに時間がかかる代わりに低コスト）")
+    parser.add_argument('--async-extract', action='store_true',
+                        help="本文・PDFの取得を asyncio 版で行う（ページとPDFを同時取得）")
+    parser.add_argument('--parse-processes', type=int, default=settings.PARSE_PROCESSES,
+                        help="HTML/PDFの解析を任せるプロセス数（0 なら取得スレッド内で解析）")
+    parser.add_argument('--record', metavar='PATH',
+                        help="HTTP応答とAI解析の返答を記録する（benchmarks.bench_e2e でオフライン再生できる）")
+    parser.add_argument('--shard', metavar='k/N', type=parse_shard,
+                        help="自治体を N 分割した k 番目だけを巡回し、採用案件を中間ファイルに書き出す（シートには書かない）")
+    parser.add_argument('--merge', action='store_true',
+                        help="--shard で書き出した全分担の中間ファイルを合流し、重複を除いてシートに1回で書き込む")
+    parser.add_argument('--shard-dir', default=settings.SHARD_OUTPUT_DIR,
+                        help="分担ごとの中間ファイルの置き場所")
+    parser.add_argument('--resume', action='store_true',
+                        help="途中で止まった前回の実行（同じ分担・同じモード）の続きから再開する")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     logger.info("=" * 60)
     logger.info("映像案件スクレイピング v1.29 [並列高速・全門番継承版]")
     logger.info("=" * 60)
-    
+
+    if args.merge:
+        run_info = {'mode': 'merge', 'status': 'error'}
+        try:
+            accepted = run_merge(args.shard_dir)
+            if accepted is not None:
+                run_info.update({'status': 'ok', 'accepted': accepted})
+        except Exception as e:
+            logger.error(f"❌ エラー: {e}")
+        finally:
+            write_run_metrics(run_info)
+        return
+    if args.shard:
+        logger.info(f"🧩 分担巡回: {args.shard[0]}/{args.shard[1]}")
+
+    checkpoint = None
+    # 落ちた実行でもメトリクスは書き出す（分かった項目から埋めていく）
+    run_info = {'mode': 'batch' if args.batch else 'streaming',
+                'shard': list(args.shard) if args.shard else None, 'status': 'error'}
     try:
-        from scrapers.direct_scraper import search_all_prefectures_direct
         from scrapers.content_extractor import ContentExtractor
+        from scrapers.parse_pool import create_parse_pool
         
-        analyzer = AIAnalyzer()
-        sheets_manager = SheetsManager(os.environ["SPREADSHEET_ID"], json.loads(os.environ["GCP_SERVICE_ACCOUNT"]))
-        extractor = ContentExtractor()
+        analysis_cache = None
+        if settings.ANALYSIS_CACHE_ENABLED:
+            analysis_cache = AnalysisCache(os.path.join(settings.CACHE_DIR, 'analyses.sqlite3'),
+                                           settings.ANALYSIS_CACHE_TTL_DAYS, settings.ANALYSIS_CACHE_MAX_ENTRIES)
+        analyzer = BatchAnalyzer(cache=analysis_cache) if args.batch else AIAnalyzer(cache=analysis_cache)
+        if args.record:
+            from analyzer.replay_client import RecordingAnthropicClient
+            from utils.replay import FixtureArchive, enable_record
+            archive = FixtureArchive(args.record)
+            enable_record(archive)
+            if not args.batch:
+                analyzer.client = RecordingAnthropicClient(analyzer.client, archive)
+        # 分担巡回ではシートに書かない（合流で1回だけ書く）
+        sheets_manager = None if args.shard else create_sheets_manager()
+        parse_pool = create_parse_pool(args.parse_processes)
+        if args.async_extract:
+            from scrapers.async_extractor import AsyncContentExtractor
+            extractor = AsyncContentExtractor(parse_pool=parse_pool)
+            # 待ち合わせるだけのスレッドなので、同時リクエスト数まで増やしてよい
+            extract_workers = settings.ASYNC_EXTRACT_CONCURRENCY
+        else:
+            extractor = ContentExtractor(parse_pool=parse_pool)
+            extract_workers = settings.PIPELINE_EXTRACT_WORKERS
+        seen_store = None
+        if args.incremental:
+            seen_store = SeenStore(os.path.join(settings.CACHE_DIR, 'seen.sqlite3'), settings.INCREMENTAL_RECHECK_DAYS)
+            logger.info("♻️ 差分実行モード：既読リンクの再解析を省略します")
         jst = timezone(timedelta(hours=9))
         today = datetime.now(jst).date()
+        checkpoint = CheckpointLog(checkpoint_path(args.shard),
+                                   {'shard': list(args.shard) if args.shard else None, 'batch': args.batch},
+                                   resume=args.resume)
+        near_dups = create_near_duplicate_index()
 
-        logger.info("【ステップ1】全国自治体サイトから最新リンクを収集...")
-        prefecture_results = search_all_prefectures_direct()
-        all_tasks = [{"pref": p, **r} for p, rs in prefecture_results.items() for r in rs]
-        
-        logger.info(f"【ステップ2】案件選別（10件並列実行中... / 全 {len(all_tasks)}件）")
-        
-        final_projects = []
-        seen_titles = set()
+        if args.batch:
+            logger.info("【ステップ1】全国自治体サイトから最新リンクを収集...")
+            all_tasks = [{"pref": p, "order": (order, i), **r}
+                         for order, p, rs in sorted(crawl_municipalities(args.shard, checkpoint))
+                         for i, r in enumerate(rs)]
+            logger.info(f"【ステップ2】案件選別（一括バッチ解析 / 全 {len(all_tasks)}件）")
+            ordered_results = run_batch_mode(all_tasks, extractor, analyzer, today, seen_store, extract_workers,
+                                             checkpoint, near_dups)
+        else:
+            logger.info(f"【ステップ1+2】巡回しながら案件選別（取得 {extract_workers}並列 / "
+                        f"解析 {settings.PIPELINE_ANALYZE_WORKERS}並列）")
+            ordered_results = run_streaming_mode(extractor, analyzer, today, seen_store, extract_workers, args.shard,
+                                                 checkpoint, near_dups)
+        ordered_results = dedupe_by_title([(order, finalize_duplicate_urls(result))
+                                           for order, result in ordered_results])
+        for _, result in ordered_results:
+            logger.info(f"🎯 真の案件を捕捉: {result.get('title', '無題')}")
+        final_projects = [result for _, result in ordered_results]
 
-        # 🆕 並列実行の魔法：10人の作業員が同時に process_task を実行します
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # mapやsubmitを使って一気に仕事を投げる
-            futures = [executor.submit(process_task, task, extractor, analyzer, today) for task in all_tasks]
-            
-            for future in futures:
-                result = future.result()
-                if result:
-                    title = result.get('title', '無題')
-                    if title not in seen_titles:
-                        final_projects.append(result)
-                        seen_titles.add(title)
-                        logger.info(f"🎯 真の案件を捕捉: {title}")
-
-        if final_projects:
-            sheet_name = datetime.now(jst).strftime("映像案件_%Y年%m月_v16")
-            sheets_manager.append_projects(sheets_manager.prepare_v12_sheet(sheet_name), final_projects)
-            logger.info(f"✨ 完了！ 真の有効案件 {len(final_projects)}件を追加しました")
+        if args.async_extract:
+            extractor.close()
+        else:
+            timings = extractor.timing_stats()
+            logger.info(f"⏱️ 本文抽出: 通信 {timings['io']:.1f}秒 / 解析 {timings['cpu']:.1f}秒（スレッド累計）")
+        if parse_pool:
+            parse_pool.shutdown()
+
+        if args.shard:
+            # シートへの書き込みは合流（--merge）でまとめて1回
+            write_shard_results(args.shard_dir, args.shard, ordered_results,
+                                {'finished_at': datetime.now(jst).isoformat()})
+        else:
+            write_projects(sheets_manager, final_projects, jst)
+        # 書き込みまで終わったので、次の --resume は最初から
+        checkpoint.finish()
+
+        if analysis_cache:
+            stats = analysis_cache.stats()
+            logger.info(f"♻️ AI解析キャッシュ: ヒット {stats['hits']}件 / ミス {stats['misses']}件")
+        pool = pool_stats()
+        logger.info(f"🔌 HTTP接続: {pool['hosts']}ホスト / 新規接続 {pool['connections']} / "
+                    f"リクエスト {pool['requests']} (再利用率 {pool['reuse_ratio']:.0%})")
+        usage = analyzer.usage_stats()
+        if analyzer.prompt_cache_enabled:
+            logger.info(f"🧾 入力トークン: キャッシュ読込 {usage['cache_read_input_tokens']} / "
+                        f"キャッシュ書込 {usage['cache_creation_input_tokens']} / 非キャッシュ {usage['input_tokens']} "
+                        f"(出力 {usage['output_tokens']})")
         else:
-            logger.warning("⚠️ 現在募集中の有効案件は見つかりませんでした")
+            logger.info(f"🧾 入力トークン: {usage['input_tokens']} (出力 {usage['output_tokens']}) "
+                        f"※共通ルールが短くプロンプトキャッシュは対象外")
+        health = get_host_health()
+        if health:
+            health.save()
+            open_hosts = health.open_hosts()
+            if open_hosts:
+                logger.info(f"⛔ 回路遮断中のホスト {len(open_hosts)}件: {', '.join(open_hosts[:10])}")
+        run_info.update({
+            'status': 'ok',
+            'open_hosts': health.open_hosts() if health else [],
+            'accepted': len(final_projects),
+            'http_pool': {k: v for k, v in pool.items() if k != 'per_host'},
+            'tokens': usage,
+            'prompt_cache': analyzer.prompt_cache_enabled,
+            'analysis_cache': analysis_cache.stats() if analysis_cache else None,
+            'extract_timings': None if args.async_extract else extractor.timing_stats(),
+        })
             
     except Exception as e:
         logger.error(f"❌ エラー: {e}")
+        if checkpoint:
+            logger.info(f"⏯️ 途中までの進み具合は {checkpoint.path} に残っています（--resume で再開できます）")
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        write_run_metrics(run_info)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+"""非同期版の本文抽出（ページ本体と対象PDFを同時に取得する）"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import settings
+from scrapers.content_extractor import MAX_CONTENT_CHARS, extract_future_pages, parse_html
+from utils.http_client import SpooledBody, parse_total_size
+from utils.host_health import HostUnavailable, get_host_health
+from utils.metrics import METRICS, collect_call
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncContentExtractor:
+    """ContentExtractor と同じ {'url', 'content'} を返す asyncio 実装
+
+    専用スレッドでイベントループを回し、extract() は呼び出し元スレッドから同期的に使える。
+    通信は全体セマフォとホスト別セマフォの両方で絞り、
+    HTML解析やPDFのテキスト化（CPU処理）はループを止めないよう別のスレッド／プロセスに逃がす。
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, per_host: Optional[int] = None,
+                 max_pdfs: Optional[int] = None, parse_pool=None):
+        self.concurrency = concurrency or settings.ASYNC_EXTRACT_CONCURRENCY
+        self.per_host = per_host or settings.HTTP_POOL_PER_HOST
+        self.max_pdfs = max_pdfs or settings.ASYNC_EXTRACT_MAX_PDFS
+        # 解析処理の実行先（プロセスプールが無ければイベントループ既定のスレッドプール）
+        self.parse_pool = parse_pool
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.session = asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+
+    async def _open(self) -> aiohttp.ClientSession:
+        self.global_sem = asyncio.Semaphore(self.concurrency)
+        self.host_sems = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ssl=False)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': settings.USER_AGENT, 'Accept-Language': 'ja,ja-JP;q=0.9,en-US;q=0.8,en;q=0.7'},
+        )
+
+    @asynccontextmanager
+    async def _get(self, url: str, timeout: float, headers: Optional[Dict] = None):
+        """同期版の共有セッションと同じく、回路遮断中のホストは見送り、結果をホスト健康状態に記録する"""
+        health = get_host_health()
+        if health:
+            if not health.allow(url):
+                raise HostUnavailable(f"回路遮断中のため接続を見送り: {url}")
+            timeout = health.timeout_for(url, timeout)
+        started = time.perf_counter()
+        recorded = False
+        try:
+            async with self.session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+                elapsed = time.perf_counter() - started
+                METRICS.record_fetch(url, elapsed)
+                if health:
+                    health.record(url, elapsed, status=res.status)
+                recorded = True
+                yield res
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if health and not recorded:
+                health.record(url, time.perf_counter() - started, error=True)
+            raise
+
+    async def _fetch(self, url: str, timeout: float) -> bytes:
+        host = urlsplit(url).netloc.lower()
+        async with self.global_sem, self.host_sems[host]:
+            async with self._get(url, timeout) as res:
+                content = await res.read()
+            METRICS.add_bytes(url, len(content))
+            return content
+
+    async def _fetch_capped(self, url: str, timeout: float) -> SpooledBody:
+        """同期版の download_capped と同じく、Range で先頭だけを要求し上限バイトで打ち切る"""
+        max_bytes = settings.PDF_MAX_DOWNLOAD_BYTES
+        body = SpooledBody(max_bytes, settings.PDF_SPOOL_BYTES)
+        host = urlsplit(url).netloc.lower()
+        try:
+            async with self.global_sem, self.host_sems[host]:
+                async with self._get(url, timeout, headers={'Range': f'bytes=0-{max_bytes - 1}'}) as res:
+                    res.raise_for_status()
+                    if body.accept(url, parse_total_size(res.headers)):
+                        async for chunk in res.content.iter_chunked(64 * 1024):
+                            if not body.write(chunk):
+                                break
+            METRICS.add_bytes(url, body.size)
+            body.finish(url)
+            return body
+        except Exception:
+            body.close()
+            raise
+
+    async def _parse(self, stage: str, func, *args):
+        """解析処理をループの外で実行する（プロセスプールなら子プロセスのメトリクスも持ち帰る）"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            if self.parse_pool is not None:
+                result, counters = await loop.run_in_executor(self.parse_pool, collect_call, func, *args)
+                METRICS.merge_counters(counters)
+                return result
+            return await loop.run_in_executor(None, func, *args)
+        finally:
+            METRICS.add_stage_time(stage, time.perf_counter() - started)
+
+    async def _pdf_text(self, pdf_url: str) -> str:
+        try:
+            with await self._fetch_capped(pdf_url, 20) as body:
+                if body.truncated:
+                    return ""
+                return await self._parse('pdf_parse', extract_future_pages, body.source, pdf_url)
+        except Exception:
+            return ""
+
+    async def extract_async(self, url: str) -> Optional[Dict]:
+        try:
+            content = await self._fetch(url, settings.REQUEST_TIMEOUT)
+            main_text, pdf_urls = await self._parse('html_parse', parse_html, content, url)
+
+            # 対象PDFはまとめて同時取得し、連結は同期版と同じく出現順・上限文字数で打ち切る
+            pdf_texts = await asyncio.gather(*(self._pdf_text(u) for u in pdf_urls[:self.max_pdfs]))
+            combined_pdf_text = ""
+            for text in pdf_texts:
+                combined_pdf_text += text
+                if len(main_text + combined_pdf_text) > MAX_CONTENT_CHARS: break
+
+            return {'url': url, 'content': main_text + combined_pdf_text}
+        except Exception as e:
+            logger.error(f"抽出失敗: {url} - {e}")
+            return None
+
+    def extract(self, url: str) -> Optional[Dict]:
+        """同期呼び出し用（パイプラインのワーカースレッドから使う）"""
+        return asyncio.run_coroutine_threadsafe(self.extract_async(url), self.loop).result()
+
+    def extract_many(self, urls: List[str]) -> List[Optional[Dict]]:
+        """複数URLを同時に抽出し、入力順で返す"""
+        async def run():
+            return await asyncio.gather(*(self.extract_async(u) for u in urls))
+        return asyncio.run_coroutine_threadsafe(run(), self.loop).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
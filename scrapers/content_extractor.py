@@ -1,52 +1,106 @@
-import requests
 import logging
-import io
 import re
-import pdfplumber
+import threading
+import time
 from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 import urllib3
+from config import settings
+from scrapers.pdf_text import get_pdf_text_extractor
+from utils.http_client import download_capped, get_session
+from utils.metrics import METRICS, collect_call
 
 # SSLエラー対策
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logger = logging.getLogger(__name__)
 
+# PDF本文を含めた抽出テキストの上限（これを超えたら以降のPDFは読まない）
+MAX_CONTENT_CHARS = 12000
+
+def parse_html(content: bytes, url: str) -> Tuple[str, List[str]]:
+    """HTMLから本文テキストと、読む価値のあるPDFリンク（出現順）を取り出す"""
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    for tag in soup(['script', 'style', 'nav', 'header', 'footer']):
+        tag.decompose()
+    
+    # Webページ本文
+    main_text = f"【Web本文】\n{soup.get_text(separator=' ', strip=True)[:3000]}\n"
+    
+    # PDFリンクの抽出と選別
+    pdf_urls = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        link_text = link.get_text()
+        
+        if href.lower().endswith('.pdf'):
+            # 🆕 ノイズPDF（結果、回答、様式など）は読み飛ばす
+            if any(x in link_text for x in ['質問', '回答', '結果', '落札', '様式', '記入例', '名簿']):
+                continue
+            pdf_urls.append(urljoin(url, href))
+    return main_text, pdf_urls
+
+def _is_future_page(text: str) -> bool:
+    # 🆕 2026年以降、令和8年以降、またはスケジュール単語を検索
+    future_yr = re.search(r"(202[6-9]|20[3-9][0-9]|令和[8-9]|令和[1-2][0-9]|R[8-9]|R[1-2][0-9])", text)
+    is_sch = any(k in text for k in ["スケジュール", "期間", "期限", "締切", "提出", "実施"])
+    return bool(future_yr or is_sch)
+
+def extract_future_pages(source, pdf_url: str) -> str:
+    """PDFを先頭から1ページずつ走査し、2026年(R8)以降の記述やスケジュールがあるページを抜粋（約4000文字で打ち切り）"""
+    try:
+        header = f"\n--- PDF: {pdf_url.split('/')[-1]} ---\n"
+        return header + get_pdf_text_extractor().extract(
+            source, pdf_url, budget=4000 - len(header), page_filter=_is_future_page)
+    except: return ""
+
 class ContentExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, parse_pool=None):
+        # 巡回・PDF取得と同じ接続プールを共用する
+        self.session = get_session()
         self.verify = False 
+        # HTML/PDFの解析を任せるプロセスプール（None ならこのスレッドで解析）
+        self.parse_pool = parse_pool
+        self.timings = {'io': 0.0, 'cpu': 0.0}
+        self._timings_lock = threading.Lock()
+
+    def _add_timing(self, kind: str, started: float):
+        with self._timings_lock:
+            self.timings[kind] += time.perf_counter() - started
+
+    def _parse(self, stage: str, func, *args):
+        """解析処理（CPU）を実行し、所要時間を cpu として計上する"""
+        started = time.perf_counter()
+        try:
+            if self.parse_pool is not None:
+                # 子プロセスで数えたメトリクス（PDFページ数など）も持ち帰る
+                result, counters = self.parse_pool.submit(collect_call, func, *args).result()
+                METRICS.merge_counters(counters)
+                return result
+            return func(*args)
+        finally:
+            self._add_timing('cpu', started)
+            METRICS.add_stage_time(stage, time.perf_counter() - started)
+
+    def timing_stats(self) -> Dict[str, float]:
+        """通信（io）と解析（cpu）の累計秒数"""
+        with self._timings_lock:
+            return dict(self.timings)
 
     def extract(self, url: str) -> Optional[Dict]:
         try:
-            response = self.session.get(url, timeout=30, verify=self.verify)
-            response.encoding = response.apparent_encoding
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            for tag in soup(['script', 'style', 'nav', 'header', 'footer']):
-                tag.decompose()
-            
-            # Webページ本文
-            main_text = f"【Web本文】\n{soup.get_text(separator=' ', strip=True)[:3000]}\n"
+            started = time.perf_counter()
+            response = self.session.get(url, timeout=settings.REQUEST_TIMEOUT, verify=self.verify)
+            content = response.content
+            self._add_timing('io', started)
+            METRICS.record_fetch(url, time.perf_counter() - started, len(content))
+            main_text, pdf_urls = self._parse('html_parse', parse_html, content, url)
             
-            # PDFリンクの抽出と選別
             combined_pdf_text = ""
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                link_text = link.get_text()
-                
-                if href.lower().endswith('.pdf'):
-                    # 🆕 ノイズPDF（結果、回答、様式など）は読み飛ばす
-                    if any(x in link_text for x in ['質問', '回答', '結果', '落札', '様式', '記入例', '名簿']):
-                        continue
-                        
-                    pdf_url = urljoin(url, href)
-                    combined_pdf_text += self._extract_future_pages(pdf_url)
-                    
-                    if len(main_text + combined_pdf_text) > 12000: break
+            for pdf_url in pdf_urls:
+                combined_pdf_text += self._extract_future_pages(pdf_url)
+                if len(main_text + combined_pdf_text) > MAX_CONTENT_CHARS: break
 
             return {'url': url, 'content': main_text + combined_pdf_text}
         except Exception as e:
@@ -54,18 +108,12 @@ class ContentExtractor:
             return None
 
     def _extract_future_pages(self, pdf_url):
-        """PDF全ページを走査し、2026年(R8)以降の記述やスケジュールがあるページを抜粋"""
         try:
-            res = self.session.get(pdf_url, timeout=20, verify=self.verify)
-            extracted = f"\n--- PDF: {pdf_url.split('/')[-1]} ---\n"
-            with pdfplumber.open(io.BytesIO(res.content)) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-                    # 🆕 2026年以降、令和8年以降、またはスケジュール単語を検索
-                    future_yr = re.search(r"(202[6-9]|20[3-9][0-9]|令和[8-9]|令和[1-2][0-9]|R[8-9]|R[1-2][0-9])", text)
-                    is_sch = any(k in text for k in ["スケジュール", "期間", "期限", "締切", "提出", "実施"])
-                    if future_yr or is_sch:
-                        extracted += text + "\n"
-                        if len(extracted) > 4000: break
-            return extracted
+            # 巨大な仕様書PDFも先頭の上限バイトまでしか読まない（大きければ一時ファイルへ逃がす）
+            started = time.perf_counter()
+            with download_capped(pdf_url, timeout=20, verify=self.verify) as body:
+                self._add_timing('io', started)
+                if body.truncated:
+                    return ""
+                return self._parse('pdf_parse', extract_future_pages, body.source, pdf_url)
         except: return ""
@@ -0,0 +1,101 @@
+"""巡回スケジューラ（ホスト単位のトークンバケット ＋ 同時接続上限。ホストの調子に合わせて可変）"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.host_health import HostHealth, HostUnavailable
+
+
+class TokenBucket:
+    """一定レートでトークンが補充されるバケット（スレッドセーフ）"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得できるまで待機する"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveSlots:
+    """上限を後から変えられるセマフォ（上限を下げても使用中の枠は取り上げず、空くのを待つ）"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_use = 0
+        self.cond = threading.Condition()
+
+    def set_limit(self, limit: int):
+        with self.cond:
+            self.limit = max(1, limit)
+            self.cond.notify_all()
+
+    def acquire(self):
+        with self.cond:
+            while self.in_use >= self.limit:
+                self.cond.wait()
+            self.in_use += 1
+
+    def release(self):
+        with self.cond:
+            self.in_use -= 1
+            self.cond.notify()
+
+
+class HostThrottle:
+    """ホストごとに「同時接続数」と「リクエスト頻度」を制御する
+
+    health（utils.host_health.HostHealth）を渡すと、ホストの調子に合わせて頻度・同時接続数を変え、
+    回路が開いているホストは待たずに HostUnavailable を投げる。
+    """
+
+    def __init__(self, per_host_concurrency: int = 2, rate: float = 2.0, burst: int = 2,
+                 health: Optional[HostHealth] = None):
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.health = health
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, AdaptiveSlots] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self._slots[host] = AdaptiveSlots(self.per_host_concurrency)
+            bucket, slots = self._buckets[host], self._slots[host]
+        if self.health:
+            bucket.rate = self.health.rate(host)
+            slots.set_limit(self.health.concurrency(host))
+        return bucket, slots
+
+    @contextmanager
+    def slot(self, url: str):
+        """with throttle.slot(url): の間だけそのホストの枠を1つ占有する"""
+        host = urlsplit(url).netloc.lower()
+        if self.health and self.health.is_open(url):
+            raise HostUnavailable(f"回路遮断中のため接続を見送り: {url}")
+        bucket, sem = self._host_state(host)
+        sem.acquire()
+        try:
+            bucket.acquire()
+            yield
+        finally:
+            sem.release()
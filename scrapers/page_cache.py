@@ -0,0 +1,105 @@
+"""条件付きGET用ページキャッシュ（ETag / Last-Modified ＋ 解析結果の永続化）"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """URLをキーに検証子・本文・解析結果をSQLiteへ保存し、容量超過時はLRUで追い出す"""
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                parsed TEXT,
+                parser_version TEXT,
+                size INTEGER,
+                last_access REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_access ON pages(last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, body, parsed, parser_version FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        etag, last_modified, body, parsed, parser_version = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+            'parsed': json.loads(parsed) if parsed else None,
+            'parser_version': parser_version,
+        }
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """保存済みの検証子から If-None-Match / If-Modified-Since を組み立てる"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            body: bytes, parsed: Dict, parser_version: str):
+        # 検証子が無いページは304が返らないので保存しても意味がない
+        if not etag and not last_modified:
+            return
+        size = len(body) + len(url)
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, json.dumps(parsed, ensure_ascii=False),
+                 parser_version, size, time.time()),
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self.conn.commit()
+
+    def update_parsed(self, url: str, parsed: Dict, parser_version: str):
+        """本文は同じだが解析ロジックが変わった場合に解析結果だけ差し替える"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET parsed = ?, parser_version = ?, last_access = ? WHERE url = ?",
+                (json.dumps(parsed, ensure_ascii=False), parser_version, time.time(), url),
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """上限を超えたら最終アクセスの古い順に削除（上限の9割まで）"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT url, size FROM pages ORDER BY last_access").fetchall()
+        evicted = 0
+        for url, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.total_bytes -= size
+            evicted += 1
+        logger.info(f"🧹 ページキャッシュ整理: {evicted}件を削除")
@@ -0,0 +1,23 @@
+"""HTML/PDF解析用のプロセスプール（CPU処理をGILの外へ逃がす）"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def create_parse_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """workers=0 ならプールを作らない（呼び出し元のスレッドでそのまま解析する）
+
+    スレッドが動いている親プロセスを fork するとロックを抱えたまま複製される恐れがあるので、
+    子プロセスは spawn で起動する。
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        return None
+    logger.info(f"🧮 解析用プロセスプール起動: {workers}プロセス")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
@@ -1,7 +1,7 @@
-import requests
-import fitz  # PyMuPDFのライブラリ名
 import logging
-import io
+from config import settings
+from scrapers.pdf_text import get_pdf_text_extractor
+from utils.http_client import download_capped
 
 logger = logging.getLogger(__name__)
 
@@ -17,25 +17,19 @@ class PDFHandler:
 
         try:
             logger.info(f"📄 PDF深層解析を開始: {pdf_url}")
-            response = requests.get(pdf_url, timeout=30)
-            response.raise_for_status()
-
-            # メモリ上でPDFを展開
-            pdf_data = io.BytesIO(response.content)
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
-            
+            # 指定した最大ページ数まで、1ページずつ読み込む
             full_text = []
-            # 指定した最大ページ数まで読み込む
-            page_count = min(len(doc), self.max_pages)
-            
-            for page_num in range(page_count):
-                page = doc.load_page(page_num)
-                text = page.get_text()
-                if text.strip():
-                    full_text.append(f"--- Page {page_num + 1} ---")
-                    full_text.append(text)
+            page_count = 0
+            with download_capped(pdf_url, timeout=settings.REQUEST_TIMEOUT) as body:
+                if body.truncated:
+                    logger.warning(f"⚠️ PDFが取得上限を超えるため解析しません: {pdf_url}")
+                    return ""
+                for page_num, text in get_pdf_text_extractor().iter_pages(body.source, pdf_url, self.max_pages):
+                    page_count += 1
+                    if text.strip():
+                        full_text.append(f"--- Page {page_num + 1} ---")
+                        full_text.append(text)
             
-            doc.close()
             combined_text = "\n".join(full_text)
             
             if combined_text:
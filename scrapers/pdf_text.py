@@ -0,0 +1,276 @@
+"""PDFテキスト抽出の共通部品（エンジン選択・ページ単位の遅延抽出・ページキャッシュ）"""
+
+import hashlib
+import io
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+from config import settings
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# MuPDF はスレッドセーフではないため、PyMuPDF の呼び出しはこのロックの内側で行う
+_FITZ_LOCK = threading.Lock()
+
+
+class PageTextCache:
+    """(PDFのURL, 内容ハッシュ, エンジン, ページ番号) ごとの抽出済みテキスト
+
+    PDF1件（URL・内容ハッシュ・エンジン）ごとに合計サイズと最終アクセスを持ち、
+    容量超過時は最終アクセスの古いPDFからページごとまとめて追い出す（LRU）。
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        columns = [r[1] for r in self.conn.execute("PRAGMA table_info(docs)")]
+        if columns and 'last_access' not in columns:
+            # 容量管理の列が無い古い形式（キャッシュなので作り直す）
+            self.conn.execute("DROP TABLE IF EXISTS pages")
+            self.conn.execute("DROP TABLE IF EXISTS docs")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT, content_hash TEXT, engine TEXT, page INTEGER, text TEXT,
+                PRIMARY KEY (url, content_hash, engine, page)
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS docs (
+                url TEXT, content_hash TEXT, engine TEXT, page_count INTEGER,
+                size INTEGER DEFAULT 0, last_access REAL,
+                PRIMARY KEY (url, content_hash, engine)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_access ON docs(last_access)")
+        self.conn.commit()
+        with self.lock:
+            self.total_bytes = self._stored_bytes()
+            self._evict()
+            self.conn.commit()
+
+    def get_page(self, url, digest, engine, page) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT text FROM pages WHERE url = ? AND content_hash = ? AND engine = ? AND page = ?",
+                (url, digest, engine, page)).fetchone()
+        return row[0] if row else None
+
+    def put_page(self, url, digest, engine, page, text):
+        # 解析用プロセスプールから複数プロセスが同時に書くことがある。ロック待ちで諦めても抽出自体は続ける
+        size = len(text.encode('utf-8'))
+        try:
+            with self.lock:
+                old = self.conn.execute(
+                    "SELECT length(CAST(text AS BLOB)) FROM pages "
+                    "WHERE url = ? AND content_hash = ? AND engine = ? AND page = ?",
+                    (url, digest, engine, page)).fetchone()
+                self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                                  (url, digest, engine, page, text))
+                grown = size - ((old[0] or 0) if old else 0)
+                self._touch(url, digest, engine, grown=grown)
+                self.total_bytes += grown
+                self._evict()
+                self.conn.commit()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"PDFページキャッシュ書き込みスキップ: {e}")
+
+    def get_page_count(self, url, digest, engine) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT page_count FROM docs WHERE url = ? AND content_hash = ? AND engine = ?",
+                (url, digest, engine)).fetchone()
+            if row and row[0] is not None:
+                # PDFを開くたびに最終アクセスを更新（ページごとには更新しない）
+                try:
+                    self._touch(url, digest, engine)
+                    self.conn.commit()
+                except sqlite3.OperationalError as e:
+                    logger.debug(f"PDFページキャッシュ更新スキップ: {e}")
+        return row[0] if row else None
+
+    def put_page_count(self, url, digest, engine, page_count):
+        try:
+            with self.lock:
+                self._touch(url, digest, engine)
+                self.conn.execute(
+                    "UPDATE docs SET page_count = ? WHERE url = ? AND content_hash = ? AND engine = ?",
+                    (page_count, url, digest, engine))
+                self.conn.commit()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"PDFページキャッシュ書き込みスキップ: {e}")
+
+    def _touch(self, url, digest, engine, grown: int = 0):
+        """PDF1件分の行を（無ければ作って）最終アクセスと合計サイズを更新する"""
+        self.conn.execute("""
+            INSERT INTO docs (url, content_hash, engine, page_count, size, last_access)
+            VALUES (?, ?, ?, NULL, ?, ?)
+            ON CONFLICT (url, content_hash, engine)
+            DO UPDATE SET size = size + excluded.size, last_access = excluded.last_access""",
+            (url, digest, engine, grown, time.time()))
+
+    def _stored_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM docs").fetchone()[0]
+
+    def _evict(self):
+        """上限を超えたら最終アクセスの古いPDFから削除（上限の9割まで）"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        # 他のプロセスの書き込み・削除も反映した値で判断する
+        self.total_bytes = self._stored_bytes()
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT url, content_hash, engine, size FROM docs ORDER BY last_access").fetchall()
+        evicted = 0
+        for url, digest, engine, size in rows:
+            if self.total_bytes <= target:
+                break
+            key = (url, digest, engine)
+            self.conn.execute("DELETE FROM pages WHERE url = ? AND content_hash = ? AND engine = ?", key)
+            self.conn.execute("DELETE FROM docs WHERE url = ? AND content_hash = ? AND engine = ?", key)
+            self.total_bytes -= size or 0
+            evicted += 1
+        logger.info(f"🧹 PDFページキャッシュ整理: {evicted}件を削除")
+
+
+def _is_path(source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def content_hash(source) -> str:
+    """PDFの内容ハッシュ（一時ファイルに逃がした大きなPDFはメモリマップして読む）"""
+    if not _is_path(source):
+        return hashlib.sha1(source).hexdigest()
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha1(b'').hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha1(mm).hexdigest()
+
+
+class _PyMuPDFDocument:
+    name = 'pymupdf'
+
+    def __init__(self, source):
+        import fitz
+        with _FITZ_LOCK:
+            # ファイルパスで渡せば MuPDF が必要な部分だけ読み込む（途中で切れたPDFは自動修復を試みる）
+            if _is_path(source):
+                self.doc = fitz.open(source, filetype="pdf")
+            else:
+                self.doc = fitz.open(stream=source, filetype="pdf")
+            self.page_count = len(self.doc)
+
+    def page_text(self, index: int) -> str:
+        with _FITZ_LOCK:
+            return self.doc.load_page(index).get_text() or ""
+
+    def close(self):
+        with _FITZ_LOCK:
+            self.doc.close()
+
+
+class _PdfplumberDocument:
+    name = 'pdfplumber'
+
+    def __init__(self, source):
+        import pdfplumber
+        self.doc = pdfplumber.open(source if _is_path(source) else io.BytesIO(source))
+        self.page_count = len(self.doc.pages)
+
+    def page_text(self, index: int) -> str:
+        page = self.doc.pages[index]
+        text = page.extract_text() or ""
+        # レイアウト解析の結果をページごとに捨ててメモリを抑える
+        page.flush_cache()
+        return text
+
+    def close(self):
+        self.doc.close()
+
+
+ENGINES = {'pymupdf': _PyMuPDFDocument, 'pdfplumber': _PdfplumberDocument}
+
+
+class PDFTextExtractor:
+    """PDFをページ単位で遅延抽出する。既定は高速な PyMuPDF、開けなければ pdfplumber で再挑戦"""
+
+    def __init__(self, engine: Optional[str] = None, cache: Optional[PageTextCache] = None):
+        self.engine = engine or settings.PDF_TEXT_ENGINE
+        self.cache = cache
+
+    def _open(self, source):
+        engines = [self.engine] + [e for e in ENGINES if e != self.engine]
+        last_error = None
+        for name in engines:
+            try:
+                return ENGINES[name](source)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def iter_pages(self, source, pdf_url: str = '', max_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """(ページ番号, テキスト) を1ページずつ返す。途中でやめれば残りのページは解析しない
+
+        source は PDF の bytes、またはダウンロード済みの一時ファイルのパス。
+        """
+        digest = content_hash(source) if self.cache else None
+        engine = self.engine
+        page_count = self.cache.get_page_count(pdf_url, digest, engine) if self.cache else None
+        doc = None
+        try:
+            if page_count is None:
+                doc = self._open(source)
+                engine = doc.name
+                page_count = doc.page_count
+                if self.cache and engine == self.engine:
+                    self.cache.put_page_count(pdf_url, digest, engine, page_count)
+            for index in range(min(page_count, max_pages or page_count)):
+                text = self.cache.get_page(pdf_url, digest, engine, index) if self.cache else None
+                if text is None:
+                    if doc is None:
+                        doc = self._open(source)
+                    text = doc.page_text(index)
+                    METRICS.count('pdf_pages', 'parsed')
+                    if self.cache and doc.name == engine:
+                        self.cache.put_page(pdf_url, digest, engine, index, text)
+                else:
+                    METRICS.count('pdf_pages', 'cached')
+                yield index, text
+        finally:
+            if doc is not None:
+                doc.close()
+
+    def extract(self, source, pdf_url: str = '', budget: Optional[int] = None,
+                page_filter: Optional[Callable[[str], bool]] = None, max_pages: Optional[int] = None) -> str:
+        """条件に合うページを改行区切りで連結し、文字数が budget を超えた時点で以降のページは読まない"""
+        extracted = ""
+        for _, text in self.iter_pages(source, pdf_url, max_pages):
+            if page_filter and not page_filter(text):
+                continue
+            extracted += text + "\n"
+            if budget is not None and len(extracted) > budget:
+                break
+        return extracted
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_pdf_text_extractor() -> PDFTextExtractor:
+    """設定に従った共有インスタンス（ページキャッシュは CACHE_DIR 配下）"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            cache = None
+            if settings.PDF_PAGE_CACHE_ENABLED:
+                cache = PageTextCache(os.path.join(settings.CACHE_DIR, 'pdf_pages.sqlite3'), settings.PDF_PAGE_CACHE_MAX_BYTES)
+            _extractor = PDFTextExtractor(cache=cache)
+        return _extractor
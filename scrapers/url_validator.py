@@ -28,4 +28,3 @@ class URLValidator:
         new_urls = [url for url in urls if self.is_new_url(url)]
         logger.info(f"URL重複チェック: {len(urls)}件中{len(new_urls)}件が新規")
         return new_urls
-```
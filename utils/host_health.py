@@ -0,0 +1,204 @@
+"""ホストごとの健康状態（実行をまたいで持ち越す）
+
+- 応答時間の移動平均と 429/503 を見て、そのホストへの頻度（毎秒リクエスト数）と同時接続数を上げ下げする
+- 連続で失敗したホストは回路を開き（サーキットブレーカー）、冷却時間が過ぎるまで接続しない
+- 冷却明けは1件だけ短いタイムアウトで試し、成功すれば元に戻し、失敗すれば冷却時間を倍にして開き直す
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config import settings
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# 頻度を落とす応答（混雑・制限）と、失敗として数える応答
+THROTTLE_STATUSES = frozenset((429, 503))
+FAILURE_STATUSES = frozenset((500, 502, 503, 504))
+
+
+class HostUnavailable(requests.ConnectionError):
+    """回路が開いているホストへの接続を見送った（既存の接続エラー処理でそのまま扱える）"""
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class HostHealth:
+    def __init__(self, path: Optional[str], base_rate: float, base_concurrency: int,
+                 failure_threshold: int = 3, cooldown: float = 6 * 3600, probe_timeout: float = 5.0,
+                 slow_seconds: float = 5.0, min_rate: float = 0.2):
+        self.path = path
+        self.base_rate = base_rate
+        self.base_concurrency = max(1, base_concurrency)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.slow_seconds = slow_seconds
+        self.min_rate = min(min_rate, base_rate)
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Dict] = {}
+        self._probing = set()
+        self.conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS hosts ("
+                "host TEXT PRIMARY KEY, failures INTEGER, opens INTEGER, open_until REAL, "
+                "latency REAL, rate REAL, updated_at REAL)")
+            self.conn.commit()
+            for row in self.conn.execute("SELECT host, failures, opens, open_until, latency, rate FROM hosts"):
+                self.hosts[row[0]] = {'failures': row[1], 'opens': row[2], 'open_until': row[3],
+                                      'latency': row[4], 'rate': min(row[5], base_rate)}
+
+    def _state(self, host: str) -> Dict:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {'failures': 0, 'opens': 0, 'open_until': 0.0,
+                                        'latency': None, 'rate': self.base_rate}
+        return state
+
+    # --- 問い合わせ ---
+    def allow(self, url: str) -> bool:
+        """接続してよいか（回路が開いていれば False。冷却明けは試し打ちの1件だけ通す）"""
+        host = host_of(url)
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None or not state['open_until']:
+                return True
+            if time.time() < state['open_until'] or host in self._probing:
+                METRICS.count('circuit', 'skipped')
+                return False
+            self._probing.add(host)
+        METRICS.count('circuit', 'probe')
+        logger.info(f"🩺 冷却明けの試し接続: {host}")
+        return True
+
+    def is_open(self, url: str) -> bool:
+        """冷却中か（状態は変えない。待ち行列に並ぶ前の足切り用）"""
+        with self.lock:
+            state = self.hosts.get(host_of(url))
+            return bool(state and state['open_until'] > time.time())
+
+    def rate(self, host: str) -> float:
+        with self.lock:
+            state = self.hosts.get(host)
+            return state['rate'] if state else self.base_rate
+
+    def concurrency(self, host: str) -> int:
+        """落ち込んでいる・遅いホストは同時接続を1本に絞る"""
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                return self.base_concurrency
+            degraded = state['rate'] < self.base_rate or state['failures'] > 0 or \
+                (state['latency'] or 0) > self.slow_seconds
+            return 1 if degraded else self.base_concurrency
+
+    def timeout_for(self, url: str, timeout):
+        """失敗歴のあるホスト・試し接続中のホストはタイムアウトを短くする"""
+        if not isinstance(timeout, (int, float)):
+            return timeout
+        host = host_of(url)
+        with self.lock:
+            state = self.hosts.get(host)
+            if state and (state['failures'] > 0 or host in self._probing):
+                return min(timeout, self.probe_timeout)
+        return timeout
+
+    # --- 結果の記録 ---
+    def record(self, url: str, seconds: float, status: Optional[int] = None, error: bool = False):
+        host = host_of(url)
+        opened = False
+        with self.lock:
+            state = self._state(host)
+            was_probing = host in self._probing
+            self._probing.discard(host)
+            if status in THROTTLE_STATUSES:
+                # 混雑・制限：頻度を半分に
+                state['rate'] = max(self.min_rate, state['rate'] / 2)
+            failed = error or status in FAILURE_STATUSES
+            if failed:
+                state['failures'] += 1
+                state['rate'] = max(self.min_rate, state['rate'] / 2)
+                already_open = state['open_until'] > time.time()
+                if was_probing or (state['failures'] >= self.failure_threshold and not already_open):
+                    # 連続失敗（または試し接続の失敗）：回路を開く。開くたびに冷却時間を倍に
+                    state['opens'] += 1
+                    state['open_until'] = time.time() + self.cooldown * 2 ** min(state['opens'] - 1, 4)
+                    opened = True
+            else:
+                state['failures'] = 0
+                state['open_until'] = 0.0
+                state['opens'] = 0
+                latency = state['latency']
+                state['latency'] = seconds if latency is None else 0.8 * latency + 0.2 * seconds
+                if status not in THROTTLE_STATUSES:
+                    # 順調なら少しずつ元の頻度へ戻す
+                    state['rate'] = min(self.base_rate, state['rate'] + self.base_rate * 0.1)
+            snapshot = dict(state)
+        if opened:
+            METRICS.count('circuit', 'opened')
+            logger.warning(f"⛔ {host}: 連続{snapshot['failures']}回失敗のため "
+                           f"{(snapshot['open_until'] - time.time()) / 3600:.1f}時間 接続を見送ります")
+            self._save_host(host, snapshot)
+
+    # --- 保存 ---
+    def _save_host(self, host: str, state: Dict):
+        if not self.conn:
+            return
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (host, state['failures'], state['opens'], state['open_until'],
+                               state['latency'], state['rate'], time.time()))
+            self.conn.commit()
+
+    def save(self):
+        """実行の最後に全ホストの状態を書き出す"""
+        if not self.conn:
+            return
+        with self.lock:
+            now = time.time()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(host, s['failures'], s['opens'], s['open_until'], s['latency'], s['rate'], now)
+                 for host, s in self.hosts.items()])
+            self.conn.commit()
+
+    def open_hosts(self):
+        with self.lock:
+            now = time.time()
+            return sorted(h for h, s in self.hosts.items() if s['open_until'] > now)
+
+
+_health = None
+_health_lock = threading.Lock()
+
+
+def get_host_health() -> Optional[HostHealth]:
+    """プロセス内で1つだけのホスト健康状態（無効化されていれば None）"""
+    global _health
+    if not settings.HOST_HEALTH_ENABLED:
+        return None
+    with _health_lock:
+        if _health is None:
+            _health = HostHealth(
+                os.path.join(settings.CACHE_DIR, 'host_health.sqlite3'),
+                base_rate=settings.CRAWL_PER_HOST_RATE,
+                base_concurrency=settings.CRAWL_PER_HOST_CONCURRENCY,
+                failure_threshold=settings.HOST_FAILURE_THRESHOLD,
+                cooldown=settings.HOST_COOLDOWN_SECONDS,
+                probe_timeout=settings.HOST_PROBE_TIMEOUT,
+                slow_seconds=settings.HOST_SLOW_SECONDS,
+            )
+        return _health
@@ -0,0 +1,223 @@
+"""共有HTTPクライアント（接続プール・リトライ・ホスト単位の接続上限）"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class HealthAwareAdapter(HTTPAdapter):
+    """回路が開いているホストには接続せず、各リクエストの結果をホスト健康状態に記録するアダプター"""
+
+    def send(self, request, **kwargs):
+        from utils.host_health import HostUnavailable, get_host_health
+        health = get_host_health()
+        if health is None:
+            return super().send(request, **kwargs)
+        if not health.allow(request.url):
+            raise HostUnavailable(f"回路遮断中のため接続を見送り: {request.url}", request=request)
+        kwargs['timeout'] = health.timeout_for(request.url, kwargs.get('timeout'))
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            health.record(request.url, time.perf_counter() - started, error=True)
+            raise
+        health.record(request.url, time.perf_counter() - started, status=response.status_code)
+        return response
+
+
+def build_session() -> requests.Session:
+    """巡回・本文取得・PDF取得で共用するセッションを作る"""
+    retry = Retry(
+        total=settings.MAX_RETRIES,
+        connect=settings.MAX_RETRIES,
+        read=settings.MAX_RETRIES,
+        status=settings.MAX_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_connections: 保持するホスト別プールの数（約570ホストを追い出さずに済む大きさ）
+    # pool_maxsize + pool_block: 1ホストあたりの同時接続数の上限
+    adapter = HealthAwareAdapter(
+        pool_connections=settings.HTTP_POOL_HOSTS,
+        pool_maxsize=settings.HTTP_POOL_PER_HOST,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': settings.USER_AGENT,
+        'Accept-Language': 'ja,ja-JP;q=0.9,en-US;q=0.8,en;q=0.7',
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """プロセス内で1つだけの共有セッション"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def pool_stats() -> Dict:
+    """接続プールの利用状況（新規接続数に対してリクエスト数が多いほど再利用できている）"""
+    session = get_session()
+    hosts = {}
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{key.key_scheme}://{key.key_host}"
+            stats = hosts.setdefault(host, {'connections': 0, 'requests': 0})
+            stats['connections'] += pool.num_connections
+            stats['requests'] += pool.num_requests
+    connections = sum(h['connections'] for h in hosts.values())
+    requests_count = sum(h['requests'] for h in hosts.values())
+    return {
+        'hosts': len(hosts),
+        'connections': connections,
+        'requests': requests_count,
+        'reuse_ratio': (1 - connections / requests_count) if requests_count else 0.0,
+        'per_host': hosts,
+    }
+
+
+class SpooledBody:
+    """上限付きでレスポンス本文を受け取る入れ物
+
+    spool_bytes まではメモリに持ち、超えたら一時ファイルへ書き出して以降はディスクに追記する。
+    max_bytes に達したらそれ以上は受け取らない（truncated=True）。
+    サーバーが申告した全体サイズが max_bytes を超えるときは本文を読まない（oversized=True、truncated=True）。
+    大きなPDFでも1ワーカーが抱えるメモリは spool_bytes 程度で頭打ちになる。
+    呼び出し側は truncated を見て、途中までしかないファイルを解析に回さないこと。
+    """
+
+    def __init__(self, max_bytes: int, spool_bytes: int):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.buffer = bytearray()
+        self.file = None
+        self.size = 0
+        self.truncated = False
+        self.total_size = None  # サーバーが申告した全体サイズ（分かる場合のみ）
+        self.oversized = False  # 申告サイズが上限を超えていたため本文を読まなかった
+
+    def accept(self, url: str, total_size: Optional[int]) -> bool:
+        """申告された全体サイズを確かめ、上限を超えるなら False（本文は読まずに終える）"""
+        self.total_size = total_size
+        if total_size and total_size > self.max_bytes:
+            self.oversized = self.truncated = True
+            METRICS.count('pdf_download', 'oversized')
+            logger.info(f"📦 上限 {self.max_bytes // (1024 * 1024)}MB を超えるため取得しません: {url} "
+                        f"({total_size // (1024 * 1024)}MB)")
+            return False
+        return True
+
+    def write(self, chunk: bytes) -> bool:
+        """受け取れたら True、上限に達したら False（呼び出し側は読み込みをやめる）"""
+        room = self.max_bytes - self.size
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        if self.file is None and self.size + len(chunk) > self.spool_bytes:
+            self.file = tempfile.NamedTemporaryFile(prefix='download-', suffix='.bin', delete=False)
+            self.file.write(self.buffer)
+            self.buffer = bytearray()
+        if self.file is not None:
+            self.file.write(chunk)
+        else:
+            self.buffer += chunk
+        self.size += len(chunk)
+        return not self.truncated
+
+    def finish(self, url: str = ''):
+        if self.total_size and self.size < self.total_size:
+            self.truncated = True
+        if self.truncated and not self.oversized:
+            METRICS.count('pdf_download', 'truncated')
+            logger.info(f"📦 上限 {self.max_bytes // (1024 * 1024)}MB で打ち切り（途中までのため解析しません）: {url}")
+        if self.file is not None:
+            self.file.close()
+
+    @property
+    def source(self):
+        """PDFエンジンに渡すもの：小さければ bytes、一時ファイルに逃がした場合はそのパス"""
+        return self.file.name if self.file is not None else bytes(self.buffer)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            try:
+                os.unlink(self.file.name)
+            except OSError:
+                pass
+            self.file = None
+        self.buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_total_size(headers) -> Optional[int]:
+    """Content-Range（bytes 0-99/12345）または Content-Length から全体サイズを得る"""
+    content_range = headers.get('Content-Range', '')
+    if '/' in content_range and not content_range.endswith('/*'):
+        return int(content_range.rsplit('/', 1)[1])
+    if headers.get('Content-Length', '').isdigit():
+        return int(headers['Content-Length'])
+    return None
+
+
+def download_capped(url: str, timeout: float, verify: bool = True, max_bytes: Optional[int] = None,
+                    spool_bytes: Optional[int] = None) -> SpooledBody:
+    """上限バイト数までだけ本文を取得する
+
+    Content-Length / Content-Range の申告サイズが max_bytes を超えるなら本文は読まない。
+    申告が無い場合も Range ヘッダーで先頭 max_bytes だけを要求し、max_bytes に達した時点で読み込みを打ち切る。
+    どちらも返り値の truncated が True になる。
+    """
+    max_bytes = max_bytes or settings.PDF_MAX_DOWNLOAD_BYTES
+    body = SpooledBody(max_bytes, spool_bytes or settings.PDF_SPOOL_BYTES)
+    headers = {'Range': f'bytes=0-{max_bytes - 1}'}
+    try:
+        started = time.perf_counter()
+        with get_session().get(url, headers=headers, timeout=timeout, verify=verify, stream=True) as res:
+            METRICS.record_fetch(url, time.perf_counter() - started)
+            res.raise_for_status()
+            if body.accept(url, parse_total_size(res.headers)):
+                for chunk in res.iter_content(chunk_size=64 * 1024):
+                    if not body.write(chunk):
+                        break
+        METRICS.add_bytes(url, body.size)
+        body.finish(url)
+        return body
+    except Exception:
+        body.close()
+        raise
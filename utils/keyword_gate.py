@@ -0,0 +1,36 @@
+"""カテゴリ別キーワードの判定エンジン（事前コンパイル済みパターン）"""
+
+import re
+from typing import Dict, FrozenSet, List
+
+from config.keywords import LISTING_GATE_KEYWORDS, TASK_GATE_KEYWORDS
+
+
+class KeywordGate:
+    """カテゴリごとのキーワード群を起動時に1度だけコンパイルしておき、使い回す
+
+    match() は1回の呼び出しで一致した全カテゴリを返す（各カテゴリは最初の一致で打ち切り）。
+    1カテゴリだけ知りたい場合は has() の方が速い。
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = tuple(categories)
+        # 長い語を先に並べておく（正規表現の選択は先勝ちのため）
+        self.patterns = {
+            cat: re.compile('|'.join(re.escape(w) for w in sorted(set(ws), key=len, reverse=True)))
+            for cat, ws in categories.items()
+        }
+        self._searches = tuple((cat, pattern.search) for cat, pattern in self.patterns.items())
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """text に現れたカテゴリの集合"""
+        return frozenset([cat for cat, search in self._searches if search(text)])
+
+    def has(self, text: str, category: str) -> bool:
+        """text に category の語が1つでも含まれるか"""
+        return self.patterns[category].search(text) is not None
+
+
+# 門番用（main.py）と一覧ページ用（direct_scraper.py）の共有インスタンス
+TASK_GATE = KeywordGate(TASK_GATE_KEYWORDS)
+LISTING_GATE = KeywordGate(LISTING_GATE_KEYWORDS)
@@ -0,0 +1,197 @@
+"""実行メトリクスの集計（段ごとの所要時間・ホスト別レイテンシ・門番の除外数など）
+
+プロセス内で1つの METRICS に各所から書き込み、実行の最後に JSON（と任意で Prometheus テキスト）に書き出す。
+解析用プロセスプールの子プロセスで増えた分は collect_call で持ち帰って merge する。
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# ホスト別レイテンシのヒストグラム境界（秒）
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.counters = {}      # 名前 → {ラベル: 回数}
+            self.stages = {}        # 段名 → {'count', 'seconds', 'max'}
+            self.observations = {}  # 名前 → [値...]（1回ごとの値。p50/p95 を出す）
+            self.hosts = {}         # ホスト → {'count', 'seconds', 'bytes', 'buckets'}
+
+    def count(self, name: str, label: str = '', n: int = 1):
+        with self.lock:
+            labels = self.counters.setdefault(name, {})
+            labels[label] = labels.get(label, 0) + n
+
+    def add_stage_time(self, stage: str, seconds: float):
+        with self.lock:
+            s = self.stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max': 0.0})
+            s['count'] += 1
+            s['seconds'] += seconds
+            s['max'] = max(s['max'], seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str):
+        """関数の1回ごとの所要時間を stage として数えるデコレーター"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            self.observations.setdefault(name, []).append(value)
+
+    def record_fetch(self, url: str, seconds: float, nbytes: int = 0):
+        """1回のHTTP取得（ホスト別のレイテンシと受信バイト数）"""
+        host = urlsplit(url).netloc
+        with self.lock:
+            h = self.hosts.setdefault(host, {'count': 0, 'seconds': 0.0, 'bytes': 0,
+                                             'buckets': [0] * (len(LATENCY_BUCKETS) + 1)})
+            h['count'] += 1
+            h['seconds'] += seconds
+            h['bytes'] += nbytes
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    h['buckets'][i] += 1
+                    break
+            else:
+                h['buckets'][-1] += 1
+
+    def add_bytes(self, url: str, nbytes: int):
+        """レイテンシを測った後に本文を読み進めた分の受信バイト数"""
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host in self.hosts:
+                self.hosts[host]['bytes'] += nbytes
+
+    def snapshot_counters(self) -> Dict:
+        with self.lock:
+            return {name: dict(labels) for name, labels in self.counters.items()}
+
+    def merge_counters(self, counters: Dict):
+        for name, labels in counters.items():
+            for label, n in labels.items():
+                self.count(name, label, n)
+
+    def summary(self) -> Dict:
+        with self.lock:
+            observations = {}
+            for name, values in self.observations.items():
+                ordered = sorted(values)
+                observations[name] = {
+                    'count': len(ordered), 'sum': sum(ordered), 'max': ordered[-1] if ordered else 0,
+                    'p50': _percentile(ordered, 50), 'p95': _percentile(ordered, 95),
+                }
+            return {
+                'started_at': self.started,
+                'wall_seconds': time.time() - self.started,
+                'stages': {k: dict(v) for k, v in self.stages.items()},
+                'counters': {k: dict(v) for k, v in self.counters.items()},
+                'observations': observations,
+                'bytes_downloaded': sum(h['bytes'] for h in self.hosts.values()),
+                'latency_buckets': list(LATENCY_BUCKETS),
+                'hosts': {k: {**v, 'buckets': list(v['buckets'])} for k, v in self.hosts.items()},
+            }
+
+    def write_json(self, path: str, extra: Optional[Dict] = None) -> Dict:
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        _atomic_write(path, json.dumps(summary, ensure_ascii=False, indent=2))
+        return summary
+
+    def write_prometheus(self, path: str):
+        """node_exporter の textfile collector 向けの形式で書き出す"""
+        summary = self.summary()
+        lines = [
+            "# TYPE scraper_run_seconds gauge",
+            f"scraper_run_seconds {summary['wall_seconds']:.3f}",
+            "# TYPE scraper_bytes_downloaded_total counter",
+            f"scraper_bytes_downloaded_total {summary['bytes_downloaded']}",
+            "# TYPE scraper_stage_seconds_total counter",
+        ]
+        for stage, s in summary['stages'].items():
+            lines.append(f'scraper_stage_seconds_total{{stage="{_escape(stage)}"}} {s["seconds"]:.3f}')
+        lines.append("# TYPE scraper_stage_calls_total counter")
+        for stage, s in summary['stages'].items():
+            lines.append(f'scraper_stage_calls_total{{stage="{_escape(stage)}"}} {s["count"]}')
+        for name, labels in summary['counters'].items():
+            lines.append(f"# TYPE scraper_{name}_total counter")
+            for label, n in labels.items():
+                lines.append(f'scraper_{name}_total{{label="{_escape(label)}"}} {n}')
+        for name, o in summary['observations'].items():
+            lines.append(f"# TYPE scraper_{name} summary")
+            lines.append(f'scraper_{name}{{quantile="0.5"}} {o["p50"]}')
+            lines.append(f'scraper_{name}{{quantile="0.95"}} {o["p95"]}')
+            lines.append(f"scraper_{name}_sum {o['sum']}")
+            lines.append(f"scraper_{name}_count {o['count']}")
+        lines.append("# TYPE scraper_fetch_seconds histogram")
+        for host, h in summary['hosts'].items():
+            cumulative = 0
+            for bound, n in zip(list(LATENCY_BUCKETS) + ['+Inf'], h['buckets']):
+                cumulative += n
+                lines.append(f'scraper_fetch_seconds_bucket{{host="{_escape(host)}",le="{bound}"}} {cumulative}')
+            lines.append(f'scraper_fetch_seconds_sum{{host="{_escape(host)}"}} {h["seconds"]:.3f}')
+            lines.append(f'scraper_fetch_seconds_count{{host="{_escape(host)}"}} {h["count"]}')
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _atomic_write(path: str, text: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+METRICS = RunMetrics()
+
+
+def collect_call(func, *args):
+    """プロセスプールの子プロセス側で func を実行し、結果と増えたカウンターを一緒に返す"""
+    before = METRICS.snapshot_counters()
+    result = func(*args)
+    after = METRICS.snapshot_counters()
+    delta = {}
+    for name, labels in after.items():
+        for label, n in labels.items():
+            diff = n - before.get(name, {}).get(label, 0)
+            if diff:
+                delta.setdefault(name, {})[label] = diff
+    return result, delta
@@ -0,0 +1,159 @@
+"""ほぼ同じ公告の検出（同じ案件のHTML・PDF告知・転載ページ・新着一覧をAI解析1回で済ませるため）
+
+本文の文字 n-gram から MinHash（1回のハッシュで128区画に振り分ける方式）の署名を作り、
+署名を32帯×4行に分けた索引で候補を引いて、一致率（Jaccard 係数の推定値）がしきい値以上なら同じ塊とみなす。
+件名（リンク文字列）は HTML・PDF告知・転載・新着一覧でばらばらなので見ず、本文だけで判定する。
+自治体の定型文で書かれた別案件を混ぜないよう、本文中の数字（日付・金額）がほぼ共通であることも条件にする。
+塊で最初の1件（リーダー）だけをAIに送り、リーダーの案件1件に塊のURLをまとめて載せる（フォロワーは行を作らない）。
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from utils.metrics import METRICS
+
+NUM_BINS = 128
+BANDS = 32
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 5
+
+_SPACES = re.compile(r'\s+')
+_NUMBERS = re.compile(r'\d+')
+
+
+def signature(text: str, k: int = SHINGLE_SIZE) -> Optional[Tuple]:
+    """本文の MinHash 署名（空白は無視。短すぎる本文は None）
+
+    組み込みの hash（SipHash）はプロセスごとに種が変わるので、署名は同じ実行の中でだけ比べる（保存しない）。
+    """
+    s = _SPACES.sub('', text).lower()
+    if len(s) < k:
+        return None
+    mins = [None] * NUM_BINS
+    for gram in {s[i:i + k] for i in range(len(s) - k + 1)}:
+        h = hash(gram) & 0xFFFFFFFFFFFFFFFF
+        b = h % NUM_BINS
+        v = h // NUM_BINS
+        if mins[b] is None or v < mins[b]:
+            mins[b] = v
+    return tuple(mins)
+
+
+def numbers(text: str) -> frozenset:
+    return frozenset(_NUMBERS.findall(text))
+
+
+def same_numbers(a: frozenset, b: frozenset, min_overlap: float = 0.8) -> bool:
+    """少ない方の数字の大半がもう一方にも出てくるか（転載ページの掲載日などの追加は許す）"""
+    if not a or not b:
+        return a == b
+    return len(a & b) / min(len(a), len(b)) >= min_overlap
+
+
+def similarity(a: Tuple, b: Tuple) -> float:
+    """両方に値のある区画のうち最小値が一致した割合（Jaccard 係数の推定）"""
+    both = [(x, y) for x, y in zip(a, b) if x is not None and y is not None]
+    return sum(1 for x, y in both if x == y) / len(both) if both else 0.0
+
+
+class Cluster:
+    """ほぼ同じ公告の塊（リーダーの解析結果をフォロワーが待つ）"""
+
+    def __init__(self, signature: Tuple, numbers: frozenset, url: str):
+        self.signature = signature
+        self.numbers = numbers
+        self.urls: List[str] = [url]
+        self.analysis: Optional[Dict] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def resolve(self, analysis: Optional[Dict]):
+        self.analysis = analysis
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """リーダーの解析結果（失敗・時間切れなら None）"""
+        self._done.wait(timeout)
+        return self.analysis
+
+    def take_over(self) -> bool:
+        """リーダーが解析に失敗した塊を引き継ぐ（最初に呼んだフォロワーだけ True。他はその結果を待つ）"""
+        with self._lock:
+            if self._done.is_set() and self.analysis is None:
+                self._done.clear()
+                return True
+            return False
+
+    def follow(self, timeout: float) -> Tuple[Optional[Dict], bool]:
+        """フォロワーとして (リーダーの解析結果, 引き継いだか) を返す
+
+        リーダーが失敗したら1件だけが引き継いで解析し直す（塊の案件は1行のまま）。
+        時間切れなら (None, False) で、呼び出し側が自分だけで解析する。
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            analysis = self.wait(max(0.0, deadline - time.monotonic()))
+            if analysis is not None:
+                return analysis, False
+            if self.take_over():
+                return None, True
+            if time.monotonic() >= deadline:
+                return None, False
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.8, min_chars: int = 200):
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.lock = threading.Lock()
+        self.buckets: List[Dict[Tuple, List[Cluster]]] = [{} for _ in range(BANDS)]
+
+    def claim(self, text: str, url: str) -> Tuple[Optional[Cluster], bool]:
+        """(塊, リーダーか) を返す。本文が短すぎて判定しない場合は (None, True)"""
+        if len(text) < self.min_chars:
+            return None, True
+        sig = signature(text)
+        if sig is None:
+            return None, True
+        nums = numbers(text)
+        bands = [sig[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+        with self.lock:
+            # 複数の帯で当たった塊も1回だけ比べ、安い数字の比較で先に絞ってから一致率を出す
+            # （定型文の多い自治体では1つの帯に何百もの塊が入るため）
+            candidates = {}
+            for i, band in enumerate(bands):
+                for cluster in self.buckets[i].get(band, ()):
+                    candidates[id(cluster)] = cluster
+            best, best_score = None, 0.0
+            for cluster in candidates.values():
+                if not same_numbers(nums, cluster.numbers):
+                    continue
+                score = similarity(sig, cluster.signature)
+                if score >= self.threshold and score > best_score:
+                    best, best_score = cluster, score
+            if best is not None:
+                best.urls.append(url)
+                METRICS.count('near_duplicate', 'follower')
+                return best, False
+            cluster = Cluster(sig, nums, url)
+            for i, band in enumerate(bands):
+                self.buckets[i].setdefault(band, []).append(cluster)
+        METRICS.count('near_duplicate', 'leader')
+        return cluster, True
+
+
+def create_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    if not settings.NEAR_DUP_ENABLED:
+        return None
+    return NearDuplicateIndex(settings.NEAR_DUP_THRESHOLD, settings.NEAR_DUP_MIN_CHARS)
+
+
+def finalize_duplicate_urls(project: Dict) -> Dict:
+    """塊のURL一覧を確定する（重複を除いて並べ、自分だけなら項目ごと外す）"""
+    urls = project.pop('duplicate_urls', None)
+    if urls and len(set(urls)) > 1:
+        project['duplicate_urls'] = sorted(set(urls))
+    return project
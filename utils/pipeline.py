@@ -0,0 +1,105 @@
+"""段階型パイプライン（有界キューでつないだ生産者／消費者）"""
+
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """1段分の処理。func が None を返した要素はそこで脱落する"""
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, queue_size: int = 100):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """段ごとにワーカー数を持ち、前段の出力を次段へ順次流す
+
+    遅い段があっても前段は止まらず（キューが満杯になるまで）先に進むので、
+    全体の所要時間は「各段の合計」ではなく「最も遅い段」に近づく。
+    """
+
+    def __init__(self, stages: List[Stage], output_queue_size: int = 100):
+        self.stages = stages
+        self.output = queue.Queue(maxsize=output_queue_size)
+        self.source_error = None  # 入力元で起きた例外（全段を流し切ってから run() で投げ直す）
+
+    def _run_stage(self, index: int, remaining: List[int]):
+        stage = self.stages[index]
+        downstream = self.stages[index + 1].inbox if index + 1 < len(self.stages) else self.output
+        while True:
+            item = stage.inbox.get()
+            if item is _STOP:
+                break
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                logger.error(f"[{stage.name}] 処理エラー: {e}")
+                result = None
+            with stage.lock:
+                stage.processed += 1
+                if result is None:
+                    stage.dropped += 1
+            if result is not None:
+                downstream.put(result)
+
+        # この段の最後のワーカーが、次段のワーカー全員に終了を伝える
+        with stage.lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            if index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    downstream.put(_STOP)
+            else:
+                downstream.put(_STOP)
+
+    def _feed(self, source: Iterable):
+        first = self.stages[0]
+        try:
+            for item in source:
+                first.inbox.put(item)
+        except Exception as e:
+            logger.error(f"[{first.name}] 入力元でエラー: {e}")
+            self.source_error = e
+        finally:
+            for _ in range(first.workers):
+                first.inbox.put(_STOP)
+
+    def run(self, source: Iterable) -> Iterator:
+        """source の要素を流し込み、最終段を通過した結果を到着順に返す
+
+        入力元（巡回）が途中で例外を出した場合は、流し込み済みの要素を処理し終えてからその例外を投げる
+        （途中までの結果で「正常終了」扱いにしないため）。
+        """
+        remaining = [stage.workers for stage in self.stages]
+        threads = [threading.Thread(target=self._feed, args=(source,), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self._run_stage, args=(index, remaining), daemon=True)
+                        for _ in range(stage.workers)]
+        for t in threads:
+            t.start()
+
+        while True:
+            item = self.output.get()
+            if item is _STOP:
+                break
+            yield item
+        for t in threads:
+            t.join()
+        if self.source_error is not None:
+            raise self.source_error
+
+    def summary(self) -> str:
+        return " / ".join(f"{s.name}: {s.processed - s.dropped}/{s.processed}通過" for s in self.stages)
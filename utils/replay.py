@@ -0,0 +1,151 @@
+"""HTTP応答の記録・再生（本番サイトに触れずに巡回〜本文抽出を再現するため）
+
+記録: enable_record(archive) の後に普段どおり巡回すると、共有セッションを通った応答が保存される。
+再生: enable_replay(archive) の後は共有セッションが保存済みの応答だけを返し、外には一切出ない。
+aiohttp 版（--async-extract）は共有セッションを使わないので対象外。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from io import BytesIO
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from utils.http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# 保存しないクエリパラメータ（Google検索のAPIキー等。再生時も同じく外して照合する）
+_SECRET_PARAMS = frozenset(('key', 'cx'))
+
+
+def archive_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class FixtureArchive:
+    """記録した応答（HTTP・AI解析）を1つのSQLiteファイルにまとめて持つ"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "method TEXT, url TEXT, status INTEGER, headers TEXT, body BLOB, recorded_at REAL, "
+            "PRIMARY KEY (method, url))")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, message TEXT, recorded_at REAL)")
+        self.conn.commit()
+
+    def get_response(self, method: str, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body FROM responses WHERE method = ? AND url = ?",
+                (method, archive_url(url))).fetchone()
+        if row is None:
+            return None
+        return {'status': row[0], 'headers': json.loads(row[1]), 'body': row[2]}
+
+    def put_response(self, method: str, url: str, status: int, headers: Dict, body: bytes):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                              (method, archive_url(url), status, json.dumps(headers), body, time.time()))
+            self.conn.commit()
+
+    def get_analysis(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT message FROM analyses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_analysis(self, key: str, message: Dict):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)",
+                              (key, json.dumps(message, ensure_ascii=False), time.time()))
+            self.conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'responses': self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+                'analyses': self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0],
+            }
+
+
+class RecordingAdapter(HTTPAdapter):
+    """本物の通信をしつつ、受け取った応答をアーカイブに残す"""
+
+    def __init__(self, archive: FixtureArchive, base: HTTPAdapter):
+        super().__init__()
+        # 通信そのものは元のアダプター（接続プール・リトライ・ホスト健康状態込み）に任せる
+        self.base = base
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = self.base.send(request, **kwargs)
+        # 本文を読み切っておけば、呼び出し側の iter_content は読み込み済みの本文から切り出される
+        self.archive.put_response(request.method, request.url, response.status_code,
+                                  dict(response.headers), response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """アーカイブにある応答だけを返す（無いURLは接続エラー扱い）"""
+
+    def __init__(self, archive: FixtureArchive, latency: float = 0.0):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency  # 通信待ちを模した1リクエストあたりの遅延（秒）
+        self.hits = 0
+        self.misses = 0
+        self._count_lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        recorded = self.archive.get_response(request.method, request.url)
+        with self._count_lock:
+            if recorded is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if recorded is None:
+            raise requests.ConnectionError(f"記録なし: {request.method} {archive_url(request.url)}",
+                                           request=request)
+        # 記録したのは展開済みの本文なので、圧縮・長さに関するヘッダーは付け直さない
+        headers = {k: v for k, v in recorded['headers'].items()
+                   if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')}
+        raw = HTTPResponse(body=BytesIO(recorded['body']), headers=headers, status=recorded['status'],
+                           preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+
+def _mount(adapter: HTTPAdapter, session: Optional[requests.Session] = None) -> HTTPAdapter:
+    session = session or get_session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return adapter
+
+
+def enable_record(archive: FixtureArchive, session: Optional[requests.Session] = None) -> RecordingAdapter:
+    """共有セッションの通信を記録するようにする"""
+    session = session or get_session()
+    logger.info("📼 HTTP応答の記録を開始します")
+    return _mount(RecordingAdapter(archive, session.get_adapter('https://')), session)
+
+
+def enable_replay(archive: FixtureArchive, latency: float = 0.0,
+                  session: Optional[requests.Session] = None) -> ReplayAdapter:
+    """共有セッションを記録済み応答の再生に切り替える（以降は外部に接続しない）"""
+    logger.info("📼 記録済みHTTP応答の再生に切り替えます")
+    return _mount(ReplayAdapter(archive, latency), session)